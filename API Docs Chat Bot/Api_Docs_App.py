@@ -5,7 +5,11 @@ from pathlib import Path
 from typing import List
 import streamlit as st
 from openai import OpenAI
-from pinecone import Pinecone, ServerlessSpec
+
+import embedding_pipeline
+import index_sync
+import vector_store
+from embedding_cache import EmbeddingCache
 from dotenv import load_dotenv
 load_dotenv()  # Loads environment variables from .env
 
@@ -16,6 +20,13 @@ INDEX_NAME = os.getenv("INDEX_NAME")
 
 client = OpenAI(api_key=OPENAI_API_KEY)
 
+@st.cache_resource
+def get_embedding_cache() -> EmbeddingCache:
+    # One SQLite connection for every Streamlit rerun / session.
+    return EmbeddingCache()
+
+embedding_cache = get_embedding_cache()
+
 # ---- Helper Functions ----
 def load_json_docs(path: Path) -> List[str]:
     data = json.loads(path.read_text(encoding="utf-8"))
@@ -35,32 +46,34 @@ def load_json_docs(path: Path) -> List[str]:
     return flatten(data)
 
 def embed_texts(texts: List[str]) -> List[List[float]]:
-    resp = client.embeddings.create(model="text-embedding-3-small", input=texts)
-    return [d.embedding for d in resp.data]
-
-# ---- Pinecone setup ----
-pc = Pinecone(api_key=PINECONE_API_KEY)
-
-if INDEX_NAME not in [idx["name"] for idx in pc.list_indexes()]:
-    pc.create_index(
-        name=INDEX_NAME,
-        dimension=1024,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region="us-east-1"),
-    )
+    # Token-budget batches, concurrent under a rate limit, retried on 429/5xx.
+    return embedding_pipeline.embed_texts(texts, client, cache=embedding_cache)
+
+# ---- Vector store setup ----
+# VECTOR_BACKEND=pinecone (default) or local (NumPy/mmap files, no network).
+@st.cache_resource
+def get_index() -> vector_store.VectorStore:
+    return vector_store.open_store(INDEX_NAME, embedding_pipeline.EMBED_DIMENSIONS)
 
-index = pc.Index(INDEX_NAME)
+index = get_index()
 
 # ---- Load and index documents ----
 doc_path = Path("./docs/api_docs_demo.json")
-chunks = load_json_docs(doc_path)
-
-# Only upsert if index is empty
-existing_vectors = index.describe_index_stats()["total_vector_count"]
-if existing_vectors == 0:
-    embeddings = embed_texts(chunks)
-    index.upsert(vectors=[(str(i), embeddings[i], {"text": chunks[i]}) for i in range(len(chunks))])
-    st.write(f"Upserted {len(chunks)} chunks into Pinecone.")
+
+@st.cache_resource
+def sync_docs(path: str, mtime: float) -> dict:
+    # Runs again only when the docs file changes; embeds/upserts added chunks, deletes removed ones.
+    manifest_path = f"index_manifest_{vector_store.VECTOR_BACKEND}_{INDEX_NAME}.json"
+    legacy_ids = None
+    if not os.path.exists(manifest_path):
+        # Indexes built before the manifest used positional ids "0".."n-1".
+        legacy_ids = [str(i) for i in range(index.describe_index_stats()["total_vector_count"])]
+    return index_sync.sync_index(load_json_docs(Path(path)), index, client, manifest_path,
+                                 cache=embedding_cache, legacy_ids=legacy_ids)
+
+sync_stats = sync_docs(str(doc_path), doc_path.stat().st_mtime)
+if sync_stats["added"] or sync_stats["removed"]:
+    st.write(f"Index sync: {sync_stats['added']} chunks added, {sync_stats['removed']} removed.")
 
 # ---- RAG Query Functions ----
 def rag_query(question: str, top_k: int = 4) -> str:
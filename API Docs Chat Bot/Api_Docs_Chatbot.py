@@ -3,13 +3,19 @@ import json
 from pathlib import Path
 from typing import List
 from openai import OpenAI
-from pinecone import Pinecone, ServerlessSpec
+
+import embedding_pipeline
+import index_sync
+import vector_store
+from embedding_cache import EmbeddingCache
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # or paste directly
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 INDEX_NAME = os.getenv("INDEX_NAME")
 
 client = OpenAI(api_key=OPENAI_API_KEY)
+# Re-indexing unchanged docs and repeated questions are served from disk.
+embedding_cache = EmbeddingCache()
 
 def load_json_docs(path: Path) -> List[str]:
     data = json.loads(path.read_text(encoding="utf-8"))
@@ -29,31 +35,23 @@ def load_json_docs(path: Path) -> List[str]:
     return flatten(data)
 
 def embed_texts(texts: List[str]) -> List[List[float]]:
-    resp = client.embeddings.create(model="text-embedding-3-small", input=texts)
-    #print("resp==>",resp)
-    return [d.embedding for d in resp.data]
-
-# ---- Pinecone setup ----
-pc = Pinecone(api_key=PINECONE_API_KEY)
-info = pc.describe_index(INDEX_NAME)
-print("Index dimension:", info)
-if INDEX_NAME not in [idx["name"] for idx in pc.list_indexes()]:
-    pc.create_index(
-        name=INDEX_NAME,
-        dimension=1024,
-        metric="cosine",
-        spec=ServerlessSpec(cloud="aws", region="us-east-1"),
-    )
+    # Token-budget batches, concurrent under a rate limit, retried on 429/5xx.
+    return embedding_pipeline.embed_texts(texts, client, cache=embedding_cache)
 
-index = pc.Index(INDEX_NAME)
+# ---- Vector store setup ----
+# VECTOR_BACKEND=pinecone (default) or local (NumPy/mmap files, no network).
+index = vector_store.open_store(INDEX_NAME, embedding_pipeline.EMBED_DIMENSIONS)
 print("index===>",index)
 # ---- Indexing ----
 doc_path = Path("./docs/api_docs_demo.json")
 chunks = load_json_docs(doc_path)
-embeddings = embed_texts(chunks)
-index.upsert(vectors=[(str(i), embeddings[i], {"text": chunks[i]}) for i in range(len(chunks))])
-
-print(f"Upserted {len(chunks)} chunks into Pinecone.")
+# Content-hash ids + manifest: only added/edited chunks are embedded, removed ones are deleted.
+manifest_path = f"index_manifest_{vector_store.VECTOR_BACKEND}_{INDEX_NAME}.json"
+legacy_ids = None
+if not os.path.exists(manifest_path):
+    # Indexes built before the manifest used positional ids "0".."n-1".
+    legacy_ids = [str(i) for i in range(index.describe_index_stats()["total_vector_count"])]
+index_sync.sync_index(chunks, index, client, manifest_path, cache=embedding_cache, legacy_ids=legacy_ids)
 
 # ---- Query ----
 def rag_query(question: str, top_k: int = 4) -> str:
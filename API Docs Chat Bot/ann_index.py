@@ -0,0 +1,154 @@
+"""
+ann_index.py
+
+Inverted-file (IVF) approximate nearest-neighbour index in NumPy, for
+LocalStore corpora too large for exact search.
+
+Vectors are clustered with spherical k-means into ``nlist`` cells; a query
+scores only the rows in its ``nprobe`` closest cells. ``nprobe`` is the
+recall / latency knob: nprobe == nlist is exact search. New rows are added
+to their nearest cell without retraining, and the index is saved as one .npz
+(centroids + cell lists in CSR form).
+
+    ivf = IVFIndex.train(vectors)          # unit-normalized float32 rows
+    rows, scores = ivf.search(vectors, q, top_k=4, nprobe=8)
+"""
+
+import os
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+NPROBE = 8
+TRAIN_SAMPLE = 50_000
+KMEANS_ITERS = 15
+_CHUNK = 65_536  # rows per assignment matmul, bounds temporary memory
+
+
+def default_nlist(n: int) -> int:
+    return int(min(max(1, 4 * np.sqrt(n)), max(1, n // 39)))  # >= ~39 training points per cell
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    out = np.empty(len(vectors), dtype=np.int32)
+    for k in range(0, len(vectors), _CHUNK):
+        out[k:k + _CHUNK] = np.argmax(np.asarray(vectors[k:k + _CHUNK]) @ centroids.T, axis=1)
+    return out
+
+
+def spherical_kmeans(sample: np.ndarray, nlist: int, iters: int = KMEANS_ITERS, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(iters):
+        labels = _assign(sample, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=nlist)
+        starts = np.r_[0, np.cumsum(counts)[:-1]]
+        sums = np.zeros_like(centroids)
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(sample[order], starts[nonempty], axis=0)
+        empty = counts == 0
+        if empty.any():  # re-seed empty cells from random points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = (sums / np.where(norms == 0, 1, norms)).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    def __init__(self, centroids: np.ndarray, nprobe: int = NPROBE):
+        self.centroids = centroids.astype(np.float32)
+        self.nprobe = nprobe
+        self.lists: List[np.ndarray] = [np.empty(0, dtype=np.int64) for _ in range(len(centroids))]
+        self._extra: List[List[np.ndarray]] = [[] for _ in range(len(centroids))]
+        self.size = 0
+        self.trained_on = 0
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, nlist: Optional[int] = None, nprobe: int = NPROBE,
+              sample: int = TRAIN_SAMPLE, seed: int = 0) -> "IVFIndex":
+        """Cluster ``vectors`` and add all of them (row ids 0..n-1)."""
+        n = len(vectors)
+        nlist = nlist or default_nlist(n)
+        rng = np.random.default_rng(seed)
+        idx = np.sort(rng.choice(n, min(n, sample), replace=False))
+        ivf = cls(spherical_kmeans(np.asarray(vectors[idx], dtype=np.float32), nlist, seed=seed), nprobe)
+        ivf.add(vectors, np.arange(n))
+        ivf.trained_on = n
+        return ivf
+
+    # ---------- updates ----------
+    def add(self, vectors: np.ndarray, rows: np.ndarray):
+        """Insert ``rows`` (store row ids) whose vectors are ``vectors``, no retraining."""
+        if len(rows) == 0:
+            return
+        labels = _assign(vectors, self.centroids)
+        order = np.argsort(labels, kind="stable")
+        labels, rows = labels[order], np.asarray(rows, dtype=np.int64)[order]
+        bounds = np.flatnonzero(np.diff(labels)) + 1
+        for part_rows, cell in zip(np.split(rows, bounds), labels[np.r_[0, bounds]]):
+            self._extra[cell].append(part_rows)
+        self.size += len(rows)
+
+    def _compact(self):
+        for c, extra in enumerate(self._extra):
+            if extra:
+                self.lists[c] = np.concatenate([self.lists[c], *extra])
+                self._extra[c] = []
+
+    def remap(self, keep: np.ndarray, total: int):
+        """Renumber rows after the store drops rows: ``keep`` = surviving old row ids, in order."""
+        self._compact()
+        new_id = np.full(total, -1, dtype=np.int64)
+        new_id[keep] = np.arange(len(keep))
+        for c, rows in enumerate(self.lists):
+            rows = new_id[rows[rows < total]]
+            self.lists[c] = rows[rows >= 0]
+        self.size = sum(len(r) for r in self.lists)
+
+    # ---------- search ----------
+    def candidates(self, q: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        self._compact()
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        cells = np.argpartition(-(self.centroids @ q), nprobe - 1)[:nprobe]
+        return np.concatenate([self.lists[c] for c in cells])
+
+    def search(self, vectors: np.ndarray, q: np.ndarray, top_k: int = 4, nprobe: Optional[int] = None,
+               alive: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, scores) of the best ``top_k`` rows among the probed cells, best first."""
+        rows = self.candidates(q, nprobe)
+        if alive is not None and len(rows):
+            rows = rows[alive[rows]]
+        if len(rows) == 0:
+            return rows, np.empty(0, dtype=np.float32)
+        rows.sort()  # sequential reads from the mmap
+        scores = np.asarray(vectors[rows]) @ q
+        k = min(top_k, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return rows[top], scores[top]
+
+    # ---------- persistence ----------
+    def save(self, path: str):
+        self._compact()
+        offsets = np.cumsum([0] + [len(r) for r in self.lists])
+        rows = np.concatenate(self.lists) if self.lists else np.empty(0, dtype=np.int64)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, centroids=self.centroids, offsets=offsets, rows=rows,
+                 meta=np.array([self.nprobe, self.trained_on]))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        with np.load(path) as z:
+            nprobe, trained_on = (int(x) for x in z["meta"])
+            ivf = cls(z["centroids"], nprobe)
+            offsets, rows = z["offsets"], z["rows"]
+        ivf.lists = [rows[offsets[c]:offsets[c + 1]] for c in range(ivf.nlist)]
+        ivf.size = len(rows)
+        ivf.trained_on = trained_on
+        return ivf
@@ -0,0 +1,103 @@
+"""
+bench_ann_index.py
+
+IVF (ann_index.py) recall@k and queries/s vs exact search on a synthetic
+corpus, for a range of nprobe values.
+
+    python bench_ann_index.py --vectors 200000 --dim 256 --queries 200 --top-k 10 --nprobe 1,4,8,16,32
+
+The corpus is a mixture of --clusters gaussian blobs on the unit sphere
+(embeddings of related doc leaves cluster the same way); --uniform uses
+unclustered random vectors, the worst case for IVF. The index is trained on
+the first --train-frac of the corpus and the rest is inserted incrementally,
+as LocalStore does between retrains.
+"""
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+
+from ann_index import IVFIndex
+
+
+def corpus(rng, n: int, dim: int, clusters: int, spread: float, uniform: bool) -> np.ndarray:
+    if uniform:
+        data = rng.standard_normal((n, dim), dtype=np.float32)
+    else:
+        centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+        centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+        data = centers[rng.integers(0, clusters, n)]
+        data += rng.standard_normal((n, dim), dtype=np.float32) * np.float32(spread / np.sqrt(dim))
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data
+
+
+def exact(vectors: np.ndarray, q: np.ndarray, top_k: int) -> np.ndarray:
+    scores = vectors @ q
+    top = np.argpartition(-scores, top_k - 1)[:top_k]
+    return top[np.argsort(-scores[top])]
+
+
+def report(name: str, times: list, recall: float):
+    times = sorted(times)
+    p50 = statistics.median(times) * 1e3
+    p95 = times[int(len(times) * 0.95) - 1] * 1e3
+    print(f"{name:<16} recall {recall:>6.3f}   p50 {p50:>8.2f} ms   p95 {p95:>8.2f} ms   "
+          f"{len(times) / sum(times):>8.0f} q/s")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--vectors", type=int, default=200_000)
+    ap.add_argument("--dim", type=int, default=256)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--top-k", type=int, default=10)
+    ap.add_argument("--nlist", type=int, default=0, help="0 = ann_index.default_nlist")
+    ap.add_argument("--nprobe", default="1,2,4,8,16,32,64")
+    ap.add_argument("--clusters", type=int, default=500)
+    ap.add_argument("--spread", type=float, default=1.5)
+    ap.add_argument("--uniform", action="store_true")
+    ap.add_argument("--train-frac", type=float, default=0.8)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = corpus(rng, args.vectors, args.dim, args.clusters, args.spread, args.uniform)
+    # Queries are perturbed corpus rows: a question lands near the doc leaves that answer it.
+    queries = data[rng.choice(args.vectors, args.queries, replace=False)]
+    queries = queries + rng.standard_normal(queries.shape, dtype=np.float32) * np.float32(args.spread / np.sqrt(args.dim))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    n_train = int(args.vectors * args.train_frac)
+    t0 = time.perf_counter()
+    ivf = IVFIndex.train(data[:n_train], args.nlist or None)
+    train_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    ivf.add(data[n_train:], np.arange(n_train, args.vectors))
+    add_s = time.perf_counter() - t0
+    print(f"{args.vectors} x {args.dim} float32 ({'uniform' if args.uniform else f'{args.clusters} clusters'}), "
+          f"top-{args.top_k}, {args.queries} queries, nlist {ivf.nlist}")
+    print(f"train on {n_train}: {train_s:.1f}s   incremental add of {args.vectors - n_train}: {add_s:.2f}s")
+
+    truth, exact_t = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        truth.append(set(exact(data, q, args.top_k).tolist()))
+        exact_t.append(time.perf_counter() - t0)
+    report("exact", exact_t, 1.0)
+
+    for nprobe in (int(x) for x in args.nprobe.split(",")):
+        if nprobe > ivf.nlist:
+            continue
+        times, hits = [], 0
+        for q, expected in zip(queries, truth):
+            t0 = time.perf_counter()
+            rows, _ = ivf.search(data, q, args.top_k, nprobe)
+            times.append(time.perf_counter() - t0)
+            hits += len(expected.intersection(rows.tolist()))
+        report(f"ivf nprobe={nprobe}", times, hits / (args.top_k * len(queries)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+bench_vector_store.py
+
+LocalStore query latency vs brute force on random unit vectors, and a check
+that both return the same top-k (LocalStore is exact, so recall must be 1.0).
+
+    python bench_vector_store.py --vectors 5000 --dim 1024 --queries 200 --top-k 4
+
+Brute force = score every row and fully sort the scores (what a naive
+implementation does); LocalStore = one mmap'd matrix-vector product plus
+argpartition over the scores.
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from vector_store import LocalStore
+
+
+def brute_force(vectors: np.ndarray, q: np.ndarray, top_k: int) -> list:
+    q = q / np.linalg.norm(q)
+    scores = [float(np.dot(v, q)) for v in vectors]
+    return sorted(range(len(scores)), key=lambda i: -scores[i])[:top_k]
+
+
+def brute_force_numpy(vectors: np.ndarray, q: np.ndarray, top_k: int) -> list:
+    scores = vectors @ (q / np.linalg.norm(q))
+    return list(np.argsort(-scores)[:top_k])
+
+
+def report(name: str, times: list):
+    times = sorted(times)
+    p50 = statistics.median(times) * 1e6
+    p95 = times[int(len(times) * 0.95) - 1] * 1e6
+    print(f"{name:<22} p50 {p50:>10.1f} µs   p95 {p95:>10.1f} µs   {len(times) / sum(times):>10.0f} q/s")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--vectors", type=int, default=5000)
+    ap.add_argument("--dim", type=int, default=1024)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--top-k", type=int, default=4)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((args.vectors, args.dim), dtype=np.float32)
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalStore(tmp, args.dim)
+        for k in range(0, args.vectors, 1000):
+            store.upsert([(str(i), data[i], {"i": i}) for i in range(k, min(k + 1000, args.vectors))])
+        store.flush()
+        store = LocalStore(tmp)  # reopen: vectors are memory-mapped from disk
+        print(f"{args.vectors} x {args.dim} float32, top-{args.top_k}, {args.queries} queries")
+
+        local_t, numpy_t, python_t, agree = [], [], [], 0
+        python_n = min(args.queries, 20)  # the pure-Python baseline is slow
+        for n, q in enumerate(queries):
+            t0 = time.perf_counter()
+            got = [int(m["id"]) for m in store.query(q, args.top_k)["matches"]]
+            local_t.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            expected = brute_force_numpy(data, q, args.top_k)
+            numpy_t.append(time.perf_counter() - t0)
+
+            if n < python_n:
+                t0 = time.perf_counter()
+                brute_force(data, q, args.top_k)
+                python_t.append(time.perf_counter() - t0)
+            agree += got == [int(i) for i in expected]
+
+        report("LocalStore.query", local_t)
+        report("numpy full argsort", numpy_t)
+        report("pure Python", python_t)
+        print(f"identical top-{args.top_k}: {agree}/{args.queries}")
+
+
+if __name__ == "__main__":
+    main()
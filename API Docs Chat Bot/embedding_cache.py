@@ -0,0 +1,100 @@
+"""
+embedding_cache.py
+
+On-disk embedding cache (SQLite) keyed by (model, dimensions, text hash).
+
+Vectors are stored as float32 blobs. Every hit refreshes a last-used time and
+the least recently used rows are evicted past ``max_entries``, so the file
+stays bounded while re-indexing unchanged docs or asking a repeated question
+costs no API call.
+
+    cache = EmbeddingCache("embeddings_cache.sqlite3")
+    vectors = embedding_pipeline.embed_texts(texts, client, cache=cache)
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from typing import List, Optional, Sequence
+
+EMBED_CACHE_FILE = "embeddings_cache.sqlite3"
+MAX_ENTRIES = 500_000
+_SQL_VARS = 500  # keys per IN (...) query, well under SQLite's variable limit
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key       TEXT PRIMARY KEY,
+    model     TEXT NOT NULL,
+    vec       BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings (last_used);
+"""
+
+
+def cache_key(model: str, dimensions: Optional[int], text: str) -> str:
+    return hashlib.sha256(f"{model}\x00{dimensions or ''}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: str = EMBED_CACHE_FILE, max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # one connection shared by worker / Streamlit threads
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def get_many(self, model: str, dimensions: Optional[int], texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors in input order (None for misses)."""
+        keys = [cache_key(model, dimensions, t) for t in texts]
+        found = {}
+        with self.lock:
+            for k in range(0, len(keys), _SQL_VARS):
+                part = keys[k:k + _SQL_VARS]
+                rows = self.db.execute(
+                    f"SELECT key, vec FROM embeddings WHERE key IN ({','.join('?' * len(part))})", part)
+                found.update(rows)
+            if found:
+                now = time.time()
+                self.db.execute("BEGIN")
+                self.db.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                    [(now, k) for k in found])
+                self.db.execute("COMMIT")
+        out = []
+        for k in keys:
+            blob = found.get(k)
+            out.append(array("f", blob).tolist() if blob is not None else None)
+        self.hits += len(found)
+        self.misses += len(keys) - sum(1 for k in keys if k in found)
+        return out
+
+    def put_many(self, model: str, dimensions: Optional[int], texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        now = time.time()
+        rows = [(cache_key(model, dimensions, t), model, array("f", v).tobytes(), now)
+                for t, v in zip(texts, vectors)]
+        with self.lock:
+            self.db.execute("BEGIN")
+            self.db.executemany("INSERT OR REPLACE INTO embeddings (key, model, vec, last_used) VALUES (?, ?, ?, ?)",
+                                rows)
+            self.db.execute("COMMIT")
+            self._evict()
+
+    def _evict(self):
+        over = self.db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+        if over > 0:
+            self.db.execute("DELETE FROM embeddings WHERE key IN "
+                            "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)", (over,))
+
+    def stats(self) -> dict:
+        with self.lock:
+            size = self.db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        return {"entries": size, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,207 @@
+"""
+embedding_pipeline.py
+
+Batched, rate-limited embedding for the API docs chatbot.
+
+- inputs are packed into requests by token budget (tiktoken if installed,
+  otherwise ~3 characters per token) and by the per-request input count
+- several batches run concurrently under a requests/min + tokens/min limiter
+- transient errors (429, 5xx, connection errors, timeouts) are retried with
+  exponential backoff, each attempt taking its own place in the limiter; a
+  failure only costs its own batch
+- results stream out as batches finish, so they can be upserted right away
+
+    from embedding_pipeline import embed_and_upsert, embed_texts
+    embed_and_upsert(chunks, index, client, cache=cache)   # index a whole doc set
+    q_emb = embed_texts([question], client, cache=cache)[0]
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+EMBED_MODEL = "text-embedding-3-small"
+# The Pinecone indexes are created with dimension=1024; text-embedding-3-* can shorten to match.
+EMBED_DIMENSIONS = 1024
+MAX_INPUT_TOKENS = 8191       # per input
+MAX_BATCH_TOKENS = 100_000    # per request (API limit is 300k)
+MAX_BATCH_ITEMS = 2048        # per request
+CONCURRENCY = 4
+REQUESTS_PER_MIN = 3000
+TOKENS_PER_MIN = 1_000_000
+RETRIES = 6
+UPSERT_BATCH = 100
+
+try:
+    import tiktoken
+    _ENC = tiktoken.get_encoding("cl100k_base")
+except ImportError:  # optional; the estimate only has to be conservative enough
+    _ENC = None
+
+
+def count_tokens(text: str) -> int:
+    if _ENC is not None:
+        return len(_ENC.encode(text, disallowed_special=()))
+    return len(text) // 3 + 1
+
+
+def _truncate(text: str, max_tokens: int = MAX_INPUT_TOKENS) -> str:
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _ENC is not None:
+        return _ENC.decode(_ENC.encode(text, disallowed_special=())[:max_tokens])
+    return text[:max_tokens * 3]
+
+
+def token_batches(texts: Sequence[str], max_tokens: int = MAX_BATCH_TOKENS,
+                  max_items: int = MAX_BATCH_ITEMS) -> Iterator[Tuple[int, List[str], int]]:
+    """Yield (start index, inputs, token count) batches that fit one embeddings request."""
+    start, batch, tokens = 0, [], 0
+    for i, text in enumerate(texts):
+        text = _truncate(text or " ")  # empty strings are rejected by the API
+        n = count_tokens(text)
+        if batch and (tokens + n > max_tokens or len(batch) >= max_items):
+            yield start, batch, tokens
+            start, batch, tokens = i, [], 0
+        batch.append(text)
+        tokens += n
+    if batch:
+        yield start, batch, tokens
+
+
+class RateLimiter:
+    """Requests/min and tokens/min budget shared by all worker threads."""
+
+    def __init__(self, requests_per_min: float = REQUESTS_PER_MIN, tokens_per_min: float = TOKENS_PER_MIN):
+        self.rpm = requests_per_min
+        self.tpm = tokens_per_min
+        self.req_allowance = requests_per_min
+        self.tok_allowance = tokens_per_min
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: int):
+        tokens = min(tokens, self.tpm)
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                elapsed = now - self.updated
+                self.updated = now
+                self.req_allowance = min(self.rpm, self.req_allowance + elapsed * self.rpm / 60)
+                self.tok_allowance = min(self.tpm, self.tok_allowance + elapsed * self.tpm / 60)
+                if self.req_allowance >= 1 and self.tok_allowance >= tokens:
+                    self.req_allowance -= 1
+                    self.tok_allowance -= tokens
+                    return
+                wait_s = max((1 - self.req_allowance) * 60 / self.rpm,
+                             (tokens - self.tok_allowance) * 60 / self.tpm)
+            time.sleep(max(wait_s, 0.01))
+
+
+def _retryable(e: Exception) -> bool:
+    import openai  # the client passed in is an openai client, so the package is there
+
+    if isinstance(e, (openai.APIConnectionError, openai.RateLimitError)):  # incl. APITimeoutError
+        return True
+    return isinstance(e, openai.APIStatusError) and e.status_code >= 500
+
+
+def embed_batch(client, texts: List[str], model: str = EMBED_MODEL, dimensions: Optional[int] = EMBED_DIMENSIONS,
+                retries: int = RETRIES, limiter: Optional[RateLimiter] = None,
+                tokens: Optional[int] = None) -> List[List[float]]:
+    """Embed one request's worth of ``texts``; with a ``limiter`` every attempt (retries too) is rate limited."""
+    kwargs = {"model": model, "input": texts}
+    if dimensions:
+        kwargs["dimensions"] = dimensions
+    for attempt in range(retries):
+        if limiter is not None:
+            limiter.acquire(tokens if tokens is not None else sum(map(count_tokens, texts)))
+        try:
+            resp = client.embeddings.create(**kwargs)
+            return [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+        except Exception as e:
+            if attempt == retries - 1 or not _retryable(e):
+                raise
+            time.sleep(min(60, 2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def iter_embeddings(texts: Sequence[str], client, model: str = EMBED_MODEL,
+                    dimensions: Optional[int] = EMBED_DIMENSIONS, concurrency: int = CONCURRENCY,
+                    limiter: Optional[RateLimiter] = None) -> Iterator[Tuple[int, List[List[float]]]]:
+    """
+    Yield (start index, vectors) as batches finish (not in order). At most
+    ``concurrency * 2`` batches are in flight, so memory stays bounded however
+    many texts there are.
+    """
+    limiter = limiter or RateLimiter()
+
+    def run(start, batch, tokens):
+        return start, embed_batch(client, batch, model, dimensions, limiter=limiter, tokens=tokens)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = set()
+        for start, batch, tokens in token_batches(texts):
+            pending.add(pool.submit(run, start, batch, tokens))
+            if len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for f in done:
+                    yield f.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                yield f.result()
+
+
+def iter_embeddings_cached(texts: Sequence[str], client, cache=None, model: str = EMBED_MODEL,
+                           dimensions: Optional[int] = EMBED_DIMENSIONS,
+                           concurrency: int = CONCURRENCY) -> Iterator[Tuple[List[int], List[List[float]]]]:
+    """
+    Like ``iter_embeddings`` but yields (positions, vectors). With an
+    EmbeddingCache (embedding_cache.py) cached texts come first and only the
+    misses are sent to the API; new vectors are written back as they arrive.
+    """
+    if cache is None:
+        for start, vectors in iter_embeddings(texts, client, model, dimensions, concurrency):
+            yield list(range(start, start + len(vectors))), vectors
+        return
+    cached = cache.get_many(model, dimensions, texts)
+    hits = [i for i, v in enumerate(cached) if v is not None]
+    for k in range(0, len(hits), MAX_BATCH_ITEMS):
+        part = hits[k:k + MAX_BATCH_ITEMS]
+        yield part, [cached[i] for i in part]
+    misses = [i for i, v in enumerate(cached) if v is None]
+    del cached
+    for start, vectors in iter_embeddings([texts[i] for i in misses], client, model, dimensions, concurrency):
+        part = misses[start:start + len(vectors)]
+        cache.put_many(model, dimensions, [texts[i] for i in part], vectors)
+        yield part, vectors
+
+
+def embed_texts(texts: Sequence[str], client, model: str = EMBED_MODEL,
+                dimensions: Optional[int] = EMBED_DIMENSIONS, concurrency: int = CONCURRENCY,
+                cache=None) -> List[List[float]]:
+    out: List[Optional[List[float]]] = [None] * len(texts)
+    for positions, vectors in iter_embeddings_cached(texts, client, cache, model, dimensions, concurrency):
+        for i, v in zip(positions, vectors):
+            out[i] = v
+    return out
+
+
+def embed_and_upsert(chunks: Sequence[str], index, client, ids: Optional[Sequence[str]] = None,
+                     metadata: Callable[[int], dict] = None, model: str = EMBED_MODEL,
+                     dimensions: Optional[int] = EMBED_DIMENSIONS, concurrency: int = CONCURRENCY,
+                     upsert_batch: int = UPSERT_BATCH, cache=None) -> int:
+    """Embed ``chunks`` and upsert each batch as soon as it is embedded. Returns the number upserted."""
+    ids = ids or [str(i) for i in range(len(chunks))]
+    metadata = metadata or (lambda i: {"text": chunks[i]})
+    done = 0
+    t0 = time.perf_counter()
+    for positions, vectors in iter_embeddings_cached(chunks, client, cache, model, dimensions, concurrency):
+        rows = [(ids[i], v, metadata(i)) for i, v in zip(positions, vectors)]
+        for k in range(0, len(rows), upsert_batch):
+            index.upsert(vectors=rows[k:k + upsert_batch])
+        done += len(rows)
+        print(f"Embedded + upserted {done}/{len(chunks)} chunks ({time.perf_counter() - t0:.1f}s)")
+    return done
@@ -0,0 +1,111 @@
+"""
+index_sync.py
+
+Keeps a vector index in step with the flattened api_docs JSON.
+
+Every chunk gets a stable id derived from its content (sha256 of the text),
+and a manifest file records which ids are in the index. A sync embeds and
+upserts only chunks whose id is new, and deletes ids that are no longer in
+the docs; an edited chunk is simply a new id plus a removed one. Unchanged
+docs cost one hash per chunk and no API calls.
+
+    stats = sync_index(load_json_docs(doc_path), index, client, "index_manifest.json")
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import embedding_pipeline
+
+MANIFEST_FILE = "index_manifest.json"
+DELETE_BATCH = 1000
+
+
+def chunk_id(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Manifest:
+    """Ids currently in the index, plus the embedding settings they were built with."""
+
+    def __init__(self, path: str = MANIFEST_FILE):
+        self.path = path
+        self.exists = os.path.exists(path)
+        self.model = None
+        self.dimensions = None
+        self.ids = set()
+        if self.exists:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self.model = raw.get("model")
+            self.dimensions = raw.get("dimensions")
+            self.ids = set(raw.get("ids", []))
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model, "dimensions": self.dimensions, "ids": sorted(self.ids)}, f)
+        os.replace(tmp, self.path)
+        self.exists = True
+
+
+def _batches(items: Sequence[str], size: int) -> Iterable[List[str]]:
+    for k in range(0, len(items), size):
+        yield list(items[k:k + size])
+
+
+def _flush(index):
+    # Local stores (vector_store.LocalStore) buffer writes; remote indexes have nothing to flush.
+    flush = getattr(index, "flush", None)
+    if flush:
+        flush()
+
+
+def sync_index(chunks: Sequence[str], index, client, manifest_path: str = MANIFEST_FILE, cache=None,
+               legacy_ids: Optional[Iterable[str]] = None, model: str = embedding_pipeline.EMBED_MODEL,
+               dimensions: Optional[int] = embedding_pipeline.EMBED_DIMENSIONS) -> dict:
+    """
+    Upsert added chunks and delete removed ones. ``legacy_ids`` are deleted as well
+    when there is no manifest yet (e.g. the old positional "0".."n" ids).
+    Returns {"added", "removed", "unchanged", "seconds"}.
+    """
+    t0 = time.perf_counter()
+    manifest = Manifest(manifest_path)
+    if manifest.model != model or manifest.dimensions != dimensions:
+        if manifest.exists:
+            print("Embedding model changed; re-embedding every chunk.")
+        stale = manifest.ids
+        manifest.ids = set()
+    else:
+        stale = set()
+    manifest.model, manifest.dimensions = model, dimensions
+
+    current: Dict[str, str] = {}
+    for text in chunks:
+        current.setdefault(chunk_id(text), text)  # identical chunks are indexed once
+    added = [cid for cid in current if cid not in manifest.ids]
+    removed = sorted((manifest.ids | stale) - current.keys())
+    if not manifest.exists and legacy_ids:
+        removed += [i for i in legacy_ids if i not in current]
+
+    if added:
+        texts = [current[cid] for cid in added]
+        embedding_pipeline.embed_and_upsert(texts, index, client, ids=added, model=model,
+                                            dimensions=dimensions, cache=cache)
+        _flush(index)
+        manifest.ids.update(added)
+        manifest.save()  # upserts are kept even if the deletes below fail
+    for batch in _batches(removed, DELETE_BATCH):
+        index.delete(ids=batch)
+        manifest.ids.difference_update(batch)
+    _flush(index)
+    manifest.save()
+
+    stats = {"added": len(added), "removed": len(removed), "unchanged": len(current) - len(added),
+             "seconds": round(time.perf_counter() - t0, 2)}
+    print(f"Index sync: {stats['added']} added, {stats['removed']} removed, "
+          f"{stats['unchanged']} unchanged ({stats['seconds']}s).")
+    return stats
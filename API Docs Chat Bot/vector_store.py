@@ -0,0 +1,303 @@
+"""
+vector_store.py
+
+Pluggable vector store for the API docs chatbot.
+
+Both backends speak the subset of the Pinecone index API the chatbot uses
+(upsert / delete / query / describe_index_stats), so embedding_pipeline and
+index_sync work with either:
+
+- PineconeStore: a Pinecone serverless index (network round-trip per query)
+- LocalStore:    float32 vectors in a .npy file opened with mmap, exact cosine
+                 top-k with one matrix-vector product + argpartition, optional
+                 Pinecone-style metadata filter; works offline. Past
+                 LOCAL_ANN_MIN vectors an IVF index (ann_index.py) is built
+                 so unfiltered queries only score a few cells
+
+    index = open_store(INDEX_NAME, dimension=1024)        # VECTOR_BACKEND=local|pinecone
+    res = index.query(vector=q_emb, top_k=4, include_metadata=True)
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ann_index import IVFIndex
+
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "pinecone")
+LOCAL_INDEX_DIR = "local_index"
+# Approximate search kicks in at this many vectors; LOCAL_ANN_NPROBE trades recall for latency.
+ANN_MIN_VECTORS = int(os.getenv("LOCAL_ANN_MIN", "100000"))
+ANN_NPROBE = int(os.getenv("LOCAL_ANN_NPROBE", "16"))
+ANN_RETRAIN_GROWTH = 2.0  # retrain the clustering once the store has doubled since training
+
+
+class VectorStore:
+    """Interface; query results look like Pinecone's: {"matches": [{"id", "score", "metadata"}]}."""
+
+    def upsert(self, vectors: Sequence[Tuple[str, Sequence[float], dict]]):
+        raise NotImplementedError
+
+    def delete(self, ids: Sequence[str]):
+        raise NotImplementedError
+
+    def query(self, vector: Sequence[float], top_k: int = 4, include_metadata: bool = True,
+              filter: Optional[dict] = None) -> dict:
+        raise NotImplementedError
+
+    def describe_index_stats(self) -> dict:
+        raise NotImplementedError
+
+    def flush(self):
+        """Persist pending writes (no-op for remote stores)."""
+
+
+# ---------- Pinecone ----------
+class PineconeStore(VectorStore):
+    def __init__(self, index):
+        self.index = index
+
+    @classmethod
+    def open(cls, name: str, dimension: int, api_key: Optional[str] = None) -> "PineconeStore":
+        from pinecone import Pinecone, ServerlessSpec
+
+        pc = Pinecone(api_key=api_key or os.getenv("PINECONE_API_KEY"))
+        if name not in [idx["name"] for idx in pc.list_indexes()]:
+            pc.create_index(
+                name=name,
+                dimension=dimension,
+                metric="cosine",
+                spec=ServerlessSpec(cloud="aws", region="us-east-1"),
+            )
+        return cls(pc.Index(name))
+
+    def upsert(self, vectors):
+        self.index.upsert(vectors=vectors)
+
+    def delete(self, ids):
+        self.index.delete(ids=list(ids))
+
+    def query(self, vector, top_k=4, include_metadata=True, filter=None):
+        kwargs = {"vector": list(vector), "top_k": top_k, "include_metadata": include_metadata}
+        if filter:
+            kwargs["filter"] = filter
+        res = self.index.query(**kwargs)
+        return {"matches": [{"id": m["id"], "score": m["score"], "metadata": m.get("metadata")}
+                            for m in res["matches"]]}
+
+    def describe_index_stats(self):
+        return {"total_vector_count": self.index.describe_index_stats()["total_vector_count"]}
+
+
+# ---------- Local (NumPy / mmap) ----------
+_OPS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+}
+
+
+def matches_filter(meta: Optional[dict], flt: dict) -> bool:
+    """Pinecone-style metadata filter: {"field": value | {"$op": value}}, plus "$and" / "$or"."""
+    meta = meta or {}
+    for key, cond in flt.items():
+        if key == "$and":
+            if not all(matches_filter(meta, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(meta, c) for c in cond):
+                return False
+        elif isinstance(cond, dict):
+            if not all(_OPS[op](meta.get(key), v) for op, v in cond.items()):
+                return False
+        elif meta.get(key) != cond:
+            return False
+    return True
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    return m / np.where(norms == 0, 1, norms)
+
+
+class LocalStore(VectorStore):
+    """
+    Vectors live in ``<path>/vectors.npy`` (unit-normalized float32, opened with
+    mmap_mode="r"), ids and metadata in ``<path>/meta.json``. Writes are buffered
+    and merged on the next query; ``flush`` compacts deleted rows and rewrites
+    the files.
+
+    Once the store holds ``ann_min_vectors`` rows, ``flush`` also builds an IVF
+    index (``<path>/ivf.npz``); new rows are added to it incrementally and
+    unfiltered queries use it (``nprobe`` per query overrides the default).
+    Filtered queries stay exact.
+    """
+
+    def __init__(self, path: str = LOCAL_INDEX_DIR, dimension: int = 1024,
+                 ann_min_vectors: int = ANN_MIN_VECTORS, nprobe: int = ANN_NPROBE):
+        self.path = path
+        self.dimension = dimension
+        self.ann_min_vectors = ann_min_vectors
+        self.nprobe = nprobe
+        self.ann: Optional[IVFIndex] = None
+        self.ids: List[Optional[str]] = []
+        self.metadata: List[Optional[dict]] = []
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        vec_file = os.path.join(path, "vectors.npy")
+        if os.path.exists(vec_file):
+            self.vectors = np.load(vec_file, mmap_mode="r")
+            with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self.ids, self.metadata = raw["ids"], raw["metadata"]
+            self.dimension = self.vectors.shape[1]
+        ivf_file = os.path.join(path, "ivf.npz")
+        if os.path.exists(ivf_file):
+            self.ann = IVFIndex.load(ivf_file)
+            if self.ann.size != len(self.ids):  # out of step with the vectors; rebuilt on the next flush
+                self.ann = None
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        self.row: Dict[str, int] = {i: r for r, i in enumerate(self.ids)}
+        self._pending: List[np.ndarray] = []
+        self._replaced: List[int] = []
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.row)
+
+    def upsert(self, vectors):
+        ids, vecs, metas = [], [], []
+        for vid, vec, meta in vectors:
+            ids.append(vid)
+            vecs.append(vec)
+            metas.append(meta)
+        if not ids:
+            return
+        arr = np.asarray(vecs, dtype=np.float32).reshape(len(ids), self.dimension)
+        start = len(self.ids)
+        for k, vid in enumerate(ids):
+            old = self.row.get(vid)
+            if old is not None:
+                self._replaced.append(old)  # dropped on the next flush
+            self.row[vid] = start + k
+        self.ids.extend(ids)
+        self.metadata.extend(metas)
+        self._pending.append(_normalize(arr))
+        self._dirty = True
+
+    def delete(self, ids):
+        self._merge()
+        for vid in ids:
+            r = self.row.pop(vid, None)
+            if r is not None:
+                self.alive[r] = False
+                self._dirty = True
+
+    def _merge(self):
+        if not self._pending:
+            return
+        new = np.concatenate(self._pending)
+        self._pending = []
+        if self.ann is not None:
+            self.ann.add(new, np.arange(len(self.vectors), len(self.vectors) + len(new)))
+        self.vectors = np.concatenate([np.asarray(self.vectors), new])
+        self.alive = np.concatenate([self.alive, np.ones(len(new), dtype=bool)])
+        self.alive[self._replaced] = False
+        self._replaced = []
+
+    def _mask(self, flt: Optional[dict]) -> np.ndarray:
+        if not flt:
+            return self.alive
+        keep = np.fromiter((matches_filter(m, flt) for m in self.metadata), dtype=bool, count=len(self.metadata))
+        return keep & self.alive
+
+    def scores(self, vector) -> np.ndarray:
+        """Cosine similarity of ``vector`` with every stored row (deleted rows included)."""
+        self._merge()
+        q = _normalize(np.asarray(vector, dtype=np.float32))
+        return self.vectors @ q
+
+    def query(self, vector, top_k=4, include_metadata=True, filter=None, nprobe: Optional[int] = None):
+        if self.ann is not None and not filter:
+            self._merge()
+            q = _normalize(np.asarray(vector, dtype=np.float32))
+            rows, scores = self.ann.search(self.vectors, q, top_k, nprobe or self.nprobe, self.alive)
+            if len(rows) >= min(top_k, len(self.row)):  # else too few live rows in the probed cells
+                return {"matches": [{"id": self.ids[r], "score": float(s),
+                                     "metadata": self.metadata[r] if include_metadata else None}
+                                    for r, s in zip(rows, scores)]}
+        scores = self.scores(vector)
+        mask = self._mask(filter)
+        if not mask.all():
+            scores = np.where(mask, scores, -np.inf)
+        k = min(top_k, int(mask.sum()))
+        if k <= 0:
+            return {"matches": []}
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return {"matches": [{"id": self.ids[r], "score": float(scores[r]),
+                             "metadata": self.metadata[r] if include_metadata else None} for r in top]}
+
+    def describe_index_stats(self):
+        return {"total_vector_count": len(self.row), "dimension": self.dimension}
+
+    def build_ann(self, nlist: Optional[int] = None):
+        """(Re)train the IVF index on the current rows and save it."""
+        self.flush()
+        self._train_ann(nlist)
+
+    def _train_ann(self, nlist: Optional[int] = None):
+        if not len(self.row):
+            return
+        self.ann = IVFIndex.train(self.vectors, nlist, self.nprobe)
+        self.ann.save(os.path.join(self.path, "ivf.npz"))
+
+    def flush(self):
+        self._merge()
+        if not self._dirty:
+            if self.ann is None and len(self.row) >= self.ann_min_vectors:
+                self._train_ann()  # e.g. a store written before it reached the threshold
+            return
+        keep = np.flatnonzero(self.alive)
+        ivf_file = os.path.join(self.path, "ivf.npz")
+        if os.path.exists(ivf_file):
+            os.remove(ivf_file)  # an interrupted flush leaves no index rather than a stale one
+        if self.ann is not None:
+            self.ann.remap(keep, len(self.alive))
+        vectors = np.ascontiguousarray(np.asarray(self.vectors)[keep])
+        self.ids = [self.ids[r] for r in keep]
+        self.metadata = [self.metadata[r] for r in keep]
+        os.makedirs(self.path, exist_ok=True)
+        vec_file = os.path.join(self.path, "vectors.npy")
+        with open(vec_file + ".tmp", "wb") as f:
+            np.save(f, vectors)
+        with open(os.path.join(self.path, "meta.json.tmp"), "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "metadata": self.metadata}, f, ensure_ascii=False)
+        self.vectors = None  # release the old mmap before replacing the file
+        os.replace(vec_file + ".tmp", vec_file)
+        os.replace(os.path.join(self.path, "meta.json.tmp"), os.path.join(self.path, "meta.json"))
+        self.vectors = np.load(vec_file, mmap_mode="r")
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        self.row = {i: r for r, i in enumerate(self.ids)}
+        self._dirty = False
+        if self.ann is None:
+            if len(self.ids) >= self.ann_min_vectors:
+                self._train_ann()
+        elif len(self.ids) > ANN_RETRAIN_GROWTH * self.ann.trained_on:
+            self._train_ann()
+        else:
+            self.ann.save(ivf_file)
+
+
+def open_store(name: Optional[str], dimension: int, backend: str = VECTOR_BACKEND) -> VectorStore:
+    if backend == "local":
+        return LocalStore(f"{LOCAL_INDEX_DIR}_{name or 'default'}", dimension)
+    if backend == "pinecone":
+        return PineconeStore.open(name, dimension)
+    raise ValueError(f"Unknown VECTOR_BACKEND {backend!r} (expected 'local' or 'pinecone')")
@@ -0,0 +1,95 @@
+"""
+bench_browser_pool.py
+
+Compares the old "launch Chromium per request" scrape with the warm
+BrowserPool. Both variants navigate to the same URL and read the same
+selector, so the difference is pure browser startup cost.
+
+    python bench_browser_pool.py --url https://example.com --requests 20 --concurrency 4
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from playwright.sync_api import sync_playwright
+
+from browser_pool import BrowserPool, DEFAULT_LAUNCH_ARGS, DEFAULT_USER_AGENT
+
+
+def per_request_launch(url: str, selector: str) -> str:
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=DEFAULT_LAUNCH_ARGS)
+        context = browser.new_context(user_agent=DEFAULT_USER_AGENT)
+        page = context.new_page()
+        page.goto(url)
+        text = page.locator(selector).first.inner_text()
+        browser.close()
+        return text
+
+
+def pooled(pool: BrowserPool, url: str, selector: str) -> str:
+    def job(page):
+        page.goto(url)
+        return page.locator(selector).first.inner_text()
+    return pool.run(job)
+
+
+def navigation_only(url: str, selector: str, n: int) -> list:
+    """Baseline: same page object, navigation + extraction only."""
+    latencies = []
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True, args=DEFAULT_LAUNCH_ARGS)
+        page = browser.new_context(user_agent=DEFAULT_USER_AGENT).new_page()
+        for _ in range(n):
+            t0 = time.perf_counter()
+            page.goto(url)
+            page.locator(selector).first.inner_text()
+            latencies.append(time.perf_counter() - t0)
+        browser.close()
+    return latencies
+
+
+def run_concurrent(fn, n: int, concurrency: int) -> list:
+    def one(_):
+        t0 = time.perf_counter()
+        fn()
+        return time.perf_counter() - t0
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        return list(ex.map(one, range(n)))
+
+
+def report(name: str, latencies: list, wall: float):
+    lat = sorted(latencies)
+    p95 = lat[min(len(lat) - 1, int(len(lat) * 0.95))]
+    print(f"{name:<22} n={len(lat):<4} p50={statistics.median(lat) * 1000:8.1f} ms  "
+          f"p95={p95 * 1000:8.1f} ms  throughput={len(lat) / wall:6.2f} req/s")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="https://example.com")
+    ap.add_argument("--selector", default="h1")
+    ap.add_argument("--requests", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--pool-size", type=int, default=4)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    lat = navigation_only(args.url, args.selector, args.requests)
+    report("navigation only", lat, time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    lat = run_concurrent(lambda: per_request_launch(args.url, args.selector), args.requests, args.concurrency)
+    report("launch per request", lat, time.perf_counter() - t0)
+
+    with BrowserPool(size=args.pool_size) as pool:
+        t0 = time.perf_counter()
+        lat = run_concurrent(lambda: pooled(pool, args.url, args.selector), args.requests, args.concurrency)
+        report("browser pool", lat, time.perf_counter() - t0)
+        print(pool.stats())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+browser_pool.py
+
+Long-lived pool of Playwright browser contexts for the Flask scrapers.
+
+Playwright's sync API is bound to the thread that started it, so every slot in
+the pool is a worker thread that owns its own browser + context. Requests
+borrow a slot by submitting a callable that receives a ready ``page``; the
+pool takes care of health checks and recycles a context after ``max_uses``.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from playwright.sync_api import sync_playwright
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114 Safari/537.36"
+DEFAULT_LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+
+class _Slot(threading.Thread):
+    """One worker thread = one browser + one context, reused across jobs."""
+
+    def __init__(self, pool: "BrowserPool", slot_id: int):
+        super().__init__(name=f"browser-slot-{slot_id}", daemon=True)
+        self.pool = pool
+        self.slot_id = slot_id
+        self.uses = 0
+        self.recycles = 0
+        self._pw = None
+        self._browser = None
+        self._context = None
+        self._page = None
+
+    # ---------- lifecycle ----------
+    def _launch_browser(self):
+        self._browser = self._pw.chromium.launch(headless=self.pool.headless, args=DEFAULT_LAUNCH_ARGS)
+
+    def _new_context(self):
+        if self._context is not None:
+            try:
+                self._context.close()
+            except Exception:
+                pass
+        self._context = self._browser.new_context(user_agent=self.pool.user_agent)
+        if self.pool.on_new_context:
+            self.pool.on_new_context(self._context)
+        self._page = self._context.new_page()
+        self.uses = 0
+
+    def _healthy(self) -> bool:
+        if self._browser is None or not self._browser.is_connected():
+            return False
+        try:
+            return self._page.evaluate("1") == 1
+        except Exception:
+            return False
+
+    def _ensure_ready(self):
+        if not self._healthy():
+            self._close_browser()
+            self._launch_browser()
+            self._new_context()
+            self.recycles += 1
+        elif self.uses >= self.pool.max_uses:
+            self._new_context()
+            self.recycles += 1
+
+    def _close_browser(self):
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except Exception:
+                pass
+        self._browser = None
+        self._context = None
+        self._page = None
+
+    # ---------- worker loop ----------
+    def run(self):
+        try:
+            self._pw = sync_playwright().start()
+            self._launch_browser()
+            self._new_context()
+        except BaseException as e:
+            self.pool._startup_errors.append(e)
+            self.pool._ready.release()
+            if self._pw is not None:
+                self._close_browser()
+                self._pw.stop()
+            return
+        self.pool._ready.release()
+        try:
+            while True:
+                job = self.pool._jobs.get()
+                if job is None:
+                    break
+                fn, fut = job
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                try:
+                    self._ensure_ready()
+                    self.uses += 1
+                    fut.set_result(fn(self._page))
+                except BaseException as e:
+                    fut.set_exception(e)
+                    # A failed job may leave the page mid-navigation; start clean next time.
+                    self.uses = self.pool.max_uses
+        finally:
+            self._close_browser()
+            self._pw.stop()
+
+
+class BrowserPool:
+    """
+    Fixed-size pool of warm browser contexts.
+
+    ``size`` bounds how many scrapes run concurrently, ``max_uses`` is how many
+    jobs a context serves before it is thrown away and recreated (keeps cookies
+    and memory growth in check).
+    """
+
+    def __init__(self, size: int = 2, max_uses: int = 50, headless: bool = True,
+                 user_agent: str = DEFAULT_USER_AGENT,
+                 on_new_context: Optional[Callable[[Any], None]] = None):
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self.user_agent = user_agent
+        self.on_new_context = on_new_context
+        self._jobs: "queue.Queue" = queue.Queue()
+        self._ready = threading.Semaphore(0)
+        self._startup_errors = []
+        self._slots = []
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> "BrowserPool":
+        with self._lock:
+            if self._started:
+                return self
+            self._startup_errors = []
+            for i in range(self.size):
+                slot = _Slot(self, i)
+                slot.start()
+                self._slots.append(slot)
+            for _ in self._slots:
+                self._ready.acquire()
+            self._started = True
+        if self._startup_errors:
+            self.close()
+            raise RuntimeError(f"Browser pool failed to start: {self._startup_errors[0]}")
+        return self
+
+    def submit(self, fn: Callable[[Any], Any]) -> Future:
+        """Queue ``fn(page)`` on the next free context."""
+        if not self._started:
+            self.start()
+        fut: Future = Future()
+        self._jobs.put((fn, fut))
+        return fut
+
+    def run(self, fn: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """Borrow a context, run ``fn(page)`` on it and return the result."""
+        return self.submit(fn).result(timeout=timeout)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "queued": self._jobs.qsize(),
+            "slots": [{"id": s.slot_id, "uses": s.uses, "recycles": s.recycles, "alive": s.is_alive()}
+                      for s in self._slots],
+        }
+
+    def close(self):
+        with self._lock:
+            for _ in self._slots:
+                self._jobs.put(None)
+            for s in self._slots:
+                s.join(timeout=10)
+            self._slots = []
+            self._jobs = queue.Queue()
+            self._started = False
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
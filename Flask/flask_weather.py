@@ -1,31 +1,110 @@
-from flask import Flask, jsonify
-from playwright.sync_api import sync_playwright
+import atexit
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, jsonify, request
+
+from browser_pool import BrowserPool
+from weather_async import AsyncWeatherScraper, parse_cities
+from weather_cache import TTLCache
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PlayWright"))
+from route_filters import install_route_filter  # noqa: E402
+from waits import WaitMetrics, wait_for_selectors  # noqa: E402
+from weather_page import WEATHER_ALLOW_SITES, WEATHER_ROUTE_PROFILE, WEATHER_SELECTORS, weather_url  # noqa: E402
 
 app = Flask(__name__)
 
+# ---------- Browser pool ----------
+POOL_SIZE = int(os.environ.get("WEATHER_POOL_SIZE", "2"))
+POOL_MAX_USES = int(os.environ.get("WEATHER_POOL_MAX_USES", "50"))
+SCRAPE_TIMEOUT_S = 30
+
+route_stats = []
+
+def _filter_context(context):
+    route_stats.append(install_route_filter(context, WEATHER_ROUTE_PROFILE, WEATHER_ALLOW_SITES))
+    del route_stats[:-POOL_SIZE]
+
+pool = BrowserPool(size=POOL_SIZE, max_uses=POOL_MAX_USES, on_new_context=_filter_context)
+atexit.register(pool.close)
+
+# ---------- Result cache ----------
+CACHE_TTL_S = int(os.environ.get("WEATHER_CACHE_TTL", "300"))
+CACHE_STALE_S = int(os.environ.get("WEATHER_CACHE_STALE", "900"))
+CACHE_FILE = os.environ.get("WEATHER_CACHE_FILE")  # e.g. weather_cache.json; unset = memory only
+# Keys include user-supplied city names, so the cache is capped (LRU).
+CACHE_MAX_ENTRIES = int(os.environ.get("WEATHER_CACHE_MAX_ENTRIES", "1000"))
+
+cache = TTLCache(ttl=CACHE_TTL_S, stale_ttl=CACHE_STALE_S, path=CACHE_FILE, max_entries=CACHE_MAX_ENTRIES)
+
+# ---------- Multi-city (async, one shared browser) ----------
+MAX_PAGES = int(os.environ.get("WEATHER_MAX_PAGES", "8"))
+PER_CITY_TIMEOUT_S = float(os.environ.get("WEATHER_CITY_TIMEOUT", "20"))
+MAX_CITIES = 100
+
+async_scraper = AsyncWeatherScraper(max_pages=MAX_PAGES, per_city_timeout=PER_CITY_TIMEOUT_S)
+atexit.register(async_scraper.close)
+
+def _scrape_tenkasi_weather(page):
+    page.goto(weather_url("Tenkasi"), wait_until="domcontentloaded")
+    metrics = wait_for_selectors(page, WEATHER_SELECTORS, metrics=WaitMetrics())
+
+    temp = page.locator("#wob_tm").inner_text()
+    cond = page.locator("#wob_dc").inner_text()
+    return {"temperature_c": temp, "condition": cond, "wait_ms": metrics.total_ms()}
+
 def get_tenkasi_weather_google():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=["--disable-blink-features=AutomationControlled"])
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114 Safari/537.36"
-        )
-        page = context.new_page()
-        page.goto("https://www.google.com/search?q=Tenkasi+weather+update")
-        page.wait_for_timeout(4000)
+    return pool.run(_scrape_tenkasi_weather, timeout=SCRAPE_TIMEOUT_S)
+
+def get_weather_cached(location: str = "tenkasi"):
+    return cache.get(location, get_tenkasi_weather_google, timeout=SCRAPE_TIMEOUT_S)
 
-        temp = page.locator("#wob_tm").inner_text()
-        cond = page.locator("#wob_dc").inner_text()
+def get_cities_weather(cities):
+    """Partial results: {"results": {city: data}, "errors": {city: message}}."""
+    def one(city):
+        try:
+            data = cache.get(f"city:{city.lower()}", lambda: async_scraper.scrape_one(city),
+                             timeout=PER_CITY_TIMEOUT_S + 30)
+            return city, data, None
+        except Exception as e:
+            return city, None, str(e) or type(e).__name__
 
-        browser.close()
-        return {"temperature_c": temp, "condition": cond}
+    results, errors = {}, {}
+    # Threads only wait on the cache / event loop; MAX_PAGES bounds the real browser work.
+    with ThreadPoolExecutor(max_workers=min(len(cities), 32)) as ex:
+        for city, data, err in ex.map(one, cities):
+            if err is None:
+                results[city] = data
+            else:
+                errors[city] = err
+    return {"results": results, "errors": errors}
 
 @app.route("/weather")
 def weather():
+    raw = request.args.get("city")
     try:
-        data = get_tenkasi_weather_google()
-        return jsonify(data)
+        if raw is None:
+            return jsonify(get_weather_cached())
+        cities = parse_cities(raw)
+        if not cities:
+            return jsonify({"error": "city must list at least one name"}), 400
+        if len(cities) > MAX_CITIES:
+            return jsonify({"error": f"at most {MAX_CITIES} cities per request"}), 400
+        return jsonify(get_cities_weather(cities))
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/weather/pool")
+def weather_pool_stats():
+    return jsonify({
+        "pool": pool.stats(),
+        "cache": cache.stats(),
+        "routes": [s.summary() for s in route_stats],
+        "async_routes": async_scraper.route_stats.summary() if async_scraper.route_stats else None,
+    })
+
 if __name__ == "__main__":
-    app.run(debug=True)
+    # The reloader would start a second process with its own pool of browsers.
+    app.run(debug=True, use_reloader=False)
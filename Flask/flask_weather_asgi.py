@@ -0,0 +1,96 @@
+"""
+flask_weather_asgi.py
+
+ASGI version of flask_weather.py built on Quart (the asyncio re-implementation
+of the Flask API) and playwright.async_api. Same routes, but a scrape only
+holds an event-loop slot while it awaits the browser, so hundreds of requests
+can be in flight per process instead of one per WSGI worker.
+
+    pip install quart hypercorn
+    hypercorn flask_weather_asgi:app --bind 127.0.0.1:8000 --workers 2
+"""
+
+import asyncio
+import os
+
+from playwright.async_api import async_playwright
+from quart import Quart, jsonify, request
+
+from browser_pool import DEFAULT_LAUNCH_ARGS, DEFAULT_USER_AGENT
+# weather_async puts ../PlayWright on sys.path; the route filter and weather card config live there.
+from weather_async import install_route_filter_async, parse_cities, scrape_cities, scrape_city
+from weather_cache import AsyncTTLCache
+from weather_page import WEATHER_ALLOW_SITES, WEATHER_ROUTE_PROFILE
+
+app = Quart(__name__)
+
+# ---------- Config ----------
+MAX_PAGES = int(os.environ.get("WEATHER_MAX_PAGES", "32"))
+PER_CITY_TIMEOUT_S = float(os.environ.get("WEATHER_CITY_TIMEOUT", "20"))
+MAX_CITIES = 100
+DEFAULT_CITY = "Tenkasi"
+
+CACHE_TTL_S = int(os.environ.get("WEATHER_CACHE_TTL", "300"))
+CACHE_STALE_S = int(os.environ.get("WEATHER_CACHE_STALE", "900"))
+CACHE_FILE = os.environ.get("WEATHER_CACHE_FILE")
+CACHE_MAX_ENTRIES = int(os.environ.get("WEATHER_CACHE_MAX_ENTRIES", "1000"))
+
+cache = AsyncTTLCache(ttl=CACHE_TTL_S, stale_ttl=CACHE_STALE_S, path=CACHE_FILE, max_entries=CACHE_MAX_ENTRIES)
+state = {}
+
+# ---------- Browser lifecycle (one browser per process) ----------
+@app.before_serving
+async def start_browser():
+    state["pw"] = await async_playwright().start()
+    state["browser"] = await state["pw"].chromium.launch(headless=True, args=DEFAULT_LAUNCH_ARGS)
+    state["context"] = await state["browser"].new_context(user_agent=DEFAULT_USER_AGENT)
+    state["routes"] = await install_route_filter_async(state["context"], WEATHER_ROUTE_PROFILE, WEATHER_ALLOW_SITES)
+    state["sem"] = asyncio.Semaphore(MAX_PAGES)
+
+@app.after_serving
+async def stop_browser():
+    await state["browser"].close()
+    await state["pw"].stop()
+
+async def scrape_one(city: str) -> dict:
+    async with state["sem"]:
+        return await asyncio.wait_for(scrape_city(state["context"], city), PER_CITY_TIMEOUT_S)
+
+async def get_city_cached(city: str) -> dict:
+    return await cache.get(f"city:{city.lower()}", lambda: scrape_one(city), timeout=PER_CITY_TIMEOUT_S + 30)
+
+# ---------- Routes ----------
+@app.route("/weather")
+async def weather():
+    raw = request.args.get("city")
+    try:
+        if raw is None:
+            return jsonify(await get_city_cached(DEFAULT_CITY))
+        cities = parse_cities(raw)
+        if not cities:
+            return jsonify({"error": "city must list at least one name"}), 400
+        if len(cities) > MAX_CITIES:
+            return jsonify({"error": f"at most {MAX_CITIES} cities per request"}), 400
+        if request.args.get("nocache"):
+            scraped = await scrape_cities(state["context"], cities, MAX_PAGES, PER_CITY_TIMEOUT_S, sem=state["sem"])
+        else:
+            outcomes = await asyncio.gather(*(get_city_cached(c) for c in cities), return_exceptions=True)
+            scraped = {c: (o if not isinstance(o, BaseException) else {"error": str(o) or type(o).__name__})
+                       for c, o in zip(cities, outcomes)}
+        results = {c: d for c, d in scraped.items() if "error" not in d}
+        errors = {c: d["error"] for c, d in scraped.items() if "error" in d}
+        return jsonify({"results": results, "errors": errors})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route("/weather/pool")
+async def weather_pool_stats():
+    sem = state.get("sem")
+    return jsonify({
+        "pool": {"max_pages": MAX_PAGES, "free_pages": sem._value if sem else None},
+        "cache": cache.stats(),
+        "routes": state["routes"].summary() if "routes" in state else None,
+    })
+
+if __name__ == "__main__":
+    app.run(debug=False)
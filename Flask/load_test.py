@@ -0,0 +1,145 @@
+"""
+load_test.py
+
+Load-test harness for the weather services against a local stub page, so no
+request ever reaches Google.
+
+1) Start the stub (serves a minimal page with #wob_tm / #wob_dc, optional
+   artificial latency via --delay-ms):
+
+    python load_test.py stub --port 8765 --delay-ms 300
+
+2) Start the service under test pointed at the stub, with caching disabled:
+
+    export WEATHER_URL_TEMPLATE="http://127.0.0.1:8765/search?q={query}"
+    export WEATHER_CACHE_TTL=0 WEATHER_CACHE_STALE=0
+    hypercorn flask_weather_asgi:app --bind 127.0.0.1:8000 --workers 2     # ASGI
+    python flask_weather.py                                                  # WSGI, for comparison
+
+3) Drive it ({n} in the URL is replaced by a request counter so every request is a distinct city):
+
+    python load_test.py run --url "http://127.0.0.1:8000/weather?city=city{n}" \
+        --concurrency 200 --duration 20
+"""
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+STUB_PAGE = """<!doctype html>
+<html><head><title>{query} - Weather</title></head>
+<body>
+  <div id="wob_wc">
+    <span id="wob_tm">{temp}</span><span>&deg;C</span>
+    <div id="wob_dc">{cond}</div>
+  </div>
+</body></html>
+"""
+
+
+# ---------- stub server ----------
+def make_stub_handler(delay_ms: int):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+            if delay_ms:
+                time.sleep(delay_ms / 1000)
+            body = STUB_PAGE.format(query=query, temp=20 + len(query) % 15, cond="Partly cloudy").encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub(port: int, delay_ms: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_stub_handler(delay_ms))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------- load generator ----------
+async def run_load(url: str, concurrency: int, duration: float, timeout: float) -> dict:
+    import httpx
+
+    counter = itertools.count()
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(client):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            target = url.replace("{n}", str(next(counter)))
+            t0 = time.perf_counter()
+            try:
+                resp = await client.get(target)
+                ok = resp.status_code == 200 and not resp.json().get("errors")
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - t0)
+            if not ok:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    lat = sorted(latencies)
+
+    def pct(p):
+        return lat[min(len(lat) - 1, int(len(lat) * p))] * 1000 if lat else 0.0
+
+    return {
+        "requests": len(lat),
+        "errors": errors,
+        "rps": round(len(lat) / elapsed, 2),
+        "p50_ms": round(statistics.median(lat) * 1000, 1) if lat else 0.0,
+        "p95_ms": round(pct(0.95), 1),
+        "p99_ms": round(pct(0.99), 1),
+        "max_ms": round(lat[-1] * 1000, 1) if lat else 0.0,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    stub = sub.add_parser("stub", help="serve the stub weather page")
+    stub.add_argument("--port", type=int, default=8765)
+    stub.add_argument("--delay-ms", type=int, default=0)
+
+    run = sub.add_parser("run", help="drive a running weather service")
+    run.add_argument("--url", required=True)
+    run.add_argument("--concurrency", type=int, default=50)
+    run.add_argument("--duration", type=float, default=15)
+    run.add_argument("--timeout", type=float, default=60)
+
+    args = ap.parse_args()
+    if args.cmd == "stub":
+        server = start_stub(args.port, args.delay_ms)
+        print(f"Stub weather page on http://127.0.0.1:{args.port}/search?q=... (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        result = asyncio.run(run_load(args.url, args.concurrency, args.duration, args.timeout))
+        for k, v in result.items():
+            print(f"{k:>9}: {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+weather_async.py
+
+Concurrent multi-city weather scraping with playwright.async_api.
+
+One Chromium instance runs on a background event loop; every city gets its
+own short-lived page, at most ``max_pages`` open at a time, and each city has
+its own timeout so one slow or failing city never sinks the batch.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from playwright.async_api import async_playwright
+
+from browser_pool import DEFAULT_LAUNCH_ARGS, DEFAULT_USER_AGENT
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "PlayWright"))
+from route_filters import install_route_filter_async  # noqa: E402
+from waits import WaitMetrics, async_wait_for_selectors  # noqa: E402
+from weather_page import WEATHER_ALLOW_SITES, WEATHER_ROUTE_PROFILE, WEATHER_SELECTORS, weather_url  # noqa: E402
+
+
+def parse_cities(raw: str) -> List[str]:
+    """'a, b,,A' -> ['a', 'b'] (trimmed, de-duplicated case-insensitively, order kept)."""
+    seen = set()
+    cities = []
+    for c in raw.split(","):
+        c = c.strip()
+        if c and c.lower() not in seen:
+            seen.add(c.lower())
+            cities.append(c)
+    return cities
+
+
+# ---------- async scraping ----------
+async def scrape_city(context, city: str) -> dict:
+    page = await context.new_page()
+    try:
+        await page.goto(weather_url(city), wait_until="domcontentloaded")
+        metrics = await async_wait_for_selectors(page, WEATHER_SELECTORS, metrics=WaitMetrics())
+        temp = await page.locator("#wob_tm").inner_text()
+        cond = await page.locator("#wob_dc").inner_text()
+        return {"temperature_c": temp, "condition": cond, "wait_ms": metrics.total_ms()}
+    finally:
+        await page.close()
+
+
+async def scrape_cities(context, cities: List[str], max_pages: int = 8,
+                        per_city_timeout: float = 20,
+                        sem: Optional[asyncio.Semaphore] = None) -> Dict[str, dict]:
+    """
+    Scrape ``cities`` concurrently in ``context``.
+
+    Returns {city: result} where a failed city maps to {"error": "..."}.
+    Pass ``sem`` to share the page limit with other callers.
+    """
+    sem = sem or asyncio.Semaphore(max_pages)
+
+    async def one(city):
+        async with sem:
+            try:
+                return city, await asyncio.wait_for(scrape_city(context, city), per_city_timeout)
+            except asyncio.TimeoutError:
+                return city, {"error": f"timed out after {per_city_timeout}s"}
+            except Exception as e:
+                return city, {"error": str(e)}
+
+    return dict(await asyncio.gather(*(one(c) for c in cities)))
+
+
+# ---------- background loop for sync callers (Flask) ----------
+class AsyncWeatherScraper:
+    """
+    Owns an event loop thread with one launched browser + context.
+
+    Sync code calls ``scrape(cities)`` / ``scrape_one(city)``; the page limit is
+    shared across all callers because it lives on the single loop.
+    """
+
+    def __init__(self, max_pages: int = 8, per_city_timeout: float = 20, headless: bool = True):
+        self.max_pages = max_pages
+        self.per_city_timeout = per_city_timeout
+        self.headless = headless
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._pw = None
+        self._browser = None
+        self._context = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self.route_stats = None
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="weather-async", daemon=True)
+                self._thread.start()
+
+    async def _ensure_browser(self):
+        if self._launch_lock is None:
+            self._launch_lock = asyncio.Lock()
+        async with self._launch_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._pw is None:
+                    self._pw = await async_playwright().start()
+                self._browser = await self._pw.chromium.launch(headless=self.headless, args=DEFAULT_LAUNCH_ARGS)
+                self._context = await self._browser.new_context(user_agent=DEFAULT_USER_AGENT)
+                self.route_stats = await install_route_filter_async(
+                    self._context, WEATHER_ROUTE_PROFILE, WEATHER_ALLOW_SITES)
+                if self._sem is None:
+                    self._sem = asyncio.Semaphore(self.max_pages)
+
+    async def _scrape_one(self, city: str) -> dict:
+        await self._ensure_browser()
+        async with self._sem:
+            return await asyncio.wait_for(scrape_city(self._context, city), self.per_city_timeout)
+
+    async def _scrape_many(self, cities: List[str]) -> Dict[str, dict]:
+        await self._ensure_browser()
+        return await scrape_cities(self._context, cities, self.max_pages, self.per_city_timeout, sem=self._sem)
+
+    def _submit(self, coro, timeout: Optional[float]):
+        self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout=timeout)
+
+    def scrape_one(self, city: str) -> dict:
+        """Scrape a single city; raises on failure (suitable as a cache loader)."""
+        return self._submit(self._scrape_one(city), self.per_city_timeout + 30)
+
+    def scrape(self, cities: List[str]) -> Dict[str, dict]:
+        """Scrape several cities; never raises for a single bad city."""
+        return self._submit(self._scrape_many(cities), self.per_city_timeout * len(cities) + 30)
+
+    async def _shutdown(self):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._pw is not None:
+            await self._pw.stop()
+
+    def close(self):
+        if self._loop is None:
+            return
+        try:
+            self._submit(self._shutdown(), 10)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop = None
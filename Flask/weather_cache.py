@@ -0,0 +1,191 @@
+"""
+weather_cache.py
+
+In-process TTL cache with stale-while-revalidate for scraped results.
+
+- fresh  (age < ttl)                : returned as-is
+- stale  (ttl <= age < ttl + stale) : returned immediately, one background refresh is started
+- expired / missing                 : loaded synchronously; concurrent misses for the
+                                      same key wait on a single loader call
+
+At most ``max_entries`` keys are kept (keys come from user input, e.g. city
+names): expired entries are dropped first, then the least recently used.
+Entries can optionally be mirrored to a JSON file so a restart starts warm.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+MAX_ENTRIES = 1000
+
+
+class TTLCache:
+    def __init__(self, ttl: float = 300, stale_ttl: float = 600, path: Optional[str] = None,
+                 max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.path = path
+        self.max_entries = max_entries
+        # Least recently used first.
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self.hits = {FRESH: 0, STALE: 0, MISS: 0}
+        if path:
+            self._load_disk()
+
+    # ---------- disk backing ----------
+    def _load_disk(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        for key, item in sorted(raw.items(), key=lambda kv: kv[1]["ts"]):
+            self._entries[key] = (item["ts"], item["value"])
+        self._prune(time.time())
+
+    def _save_disk(self):
+        if not self.path:
+            return
+        with self._lock:
+            self._prune(time.time())
+            snapshot = {k: {"ts": ts, "value": v} for k, (ts, v) in self._entries.items()}
+        with self._disk_lock:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.path)
+
+    # ---------- core ----------
+    def _prune(self, now: float):
+        """Drop expired entries, then the least recently used ones beyond ``max_entries`` (lock held)."""
+        horizon = now - self.ttl - self.stale_ttl
+        for key in [k for k, (ts, _) in self._entries.items() if ts <= horizon]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _state(self, key: str, now: float) -> Tuple[str, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISS, None
+        self._entries.move_to_end(key)
+        age = now - entry[0]
+        if age < self.ttl:
+            return FRESH, entry[1]
+        if age < self.ttl + self.stale_ttl:
+            return STALE, entry[1]
+        return MISS, None
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._prune(time.time())
+        self._save_disk()
+
+    def peek(self, key: str) -> Tuple[str, Any]:
+        with self._lock:
+            return self._state(key, time.time())
+
+    def _run_loader(self, key: str, loader: Callable[[], Any], fut: Future):
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            fut.set_exception(e)
+            return
+        self.set(key, value)
+        with self._lock:
+            self._inflight.pop(key, None)
+        fut.set_result(value)
+
+    def get(self, key: str, loader: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """Return the cached value for ``key``, calling ``loader()`` when needed."""
+        with self._lock:
+            state, value = self._state(key, time.time())
+            self.hits[state] += 1
+            if state == FRESH:
+                return value
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = Future()
+                self._inflight[key] = fut
+
+        if state == STALE:
+            if owner:
+                # Errors stay on the (unobserved) future; the stale value keeps being served.
+                threading.Thread(target=self._run_loader, args=(key, loader, fut),
+                                 name=f"refresh-{key}", daemon=True).start()
+            return value
+
+        if owner:
+            self._run_loader(key, loader, fut)
+        return fut.result(timeout=timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries,
+                    "inflight": len(self._inflight), "hits": dict(self.hits)}
+
+
+class AsyncTTLCache(TTLCache):
+    """
+    asyncio flavour of TTLCache for the ASGI app: same expiry rules and disk
+    backing, but loaders are coroutine functions, coalescing uses asyncio
+    futures and stale refreshes run as tasks on the current loop.
+    """
+
+    def __init__(self, ttl: float = 300, stale_ttl: float = 600, path: Optional[str] = None,
+                 max_entries: int = MAX_ENTRIES):
+        super().__init__(ttl, stale_ttl, path, max_entries)
+        self._ainflight: Dict[str, asyncio.Future] = {}
+        self._tasks = set()
+
+    async def _arun_loader(self, key: str, loader: Callable[[], Awaitable[Any]], fut: asyncio.Future):
+        try:
+            value = await loader()
+        except Exception as e:
+            self._ainflight.pop(key, None)
+            fut.set_exception(e)
+            # Mark retrieved so a failed background refresh does not log "never retrieved".
+            fut.exception()
+            return
+        self.set(key, value)
+        self._ainflight.pop(key, None)
+        fut.set_result(value)
+
+    async def get(self, key: str, loader: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        with self._lock:
+            state, value = self._state(key, time.time())
+            self.hits[state] += 1
+        if state == FRESH:
+            return value
+        fut = self._ainflight.get(key)
+        owner = fut is None
+        if owner:
+            fut = asyncio.get_running_loop().create_future()
+            self._ainflight[key] = fut
+            task = asyncio.create_task(self._arun_loader(key, loader, fut))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if state == STALE:
+            return value
+        return await asyncio.wait_for(asyncio.shield(fut), timeout)
+
+    def stats(self) -> dict:
+        out = super().stats()
+        out["inflight"] = len(self._ainflight)
+        return out
@@ -1,17 +1,59 @@
+import os
+
 from playwright.sync_api import sync_playwright
 
-def scrape_genai_news():
+from crawl_index import UNCHANGED, CrawlIndex, probe
+from route_filters import install_route_filter
+
+MEDIUM_BASE_URL = os.environ.get("MEDIUM_BASE_URL", "https://medium.com")
+SEARCH_QUERY = "GenAI"
+OUTPUT_FILE = "genai_news.txt"
+INDEX_FILE = "genai_index.json"
+# Route filter profile (see route_filters.py): "off", "media" or "lean".
+ROUTE_PROFILE = os.environ.get("NEWS_ROUTE_PROFILE", "lean")
+
+ARTICLE_LINK_SELECTOR = "article div[role='link']"
+TITLE_SELECTOR = "h1"
+PARAGRAPH_SELECTOR = "article p"
+
+def search_url(query: str = SEARCH_QUERY) -> str:
+    return f"{MEDIUM_BASE_URL}/search?q={query}"
+
+def first_article_url(page) -> str:
+    first_article = page.locator(ARTICLE_LINK_SELECTOR).first
+    return first_article.get_attribute("data-href")
+
+def extract_article(page):
+    title = page.locator(TITLE_SELECTOR).first.inner_text()
+    paragraphs = page.locator(PARAGRAPH_SELECTOR).all_inner_texts()
+    return title, "\n\n".join(paragraphs)
+
+def scrape_genai_news(index_path: str = INDEX_FILE):
     with sync_playwright() as p:
         # Step 1: Launch browser
         browser = p.chromium.launch(headless=False)  # set headless=True if you don't want UI
         page = browser.new_page()
+        routes = install_route_filter(page, ROUTE_PROFILE)
 
         # Step 2: Go to Medium search page for GenAI
-        page.goto("https://medium.com/search?q=GenAI")
+        page.goto(search_url())
 
         # Step 3: Grab the first article's full URL from `data-href`
-        first_article = page.locator("article div[role='link']").first
-        url = first_article.get_attribute("data-href")
+        url = first_article_url(page)
+
+        # Skip the render + rewrite when the article has not changed since the last run
+        index = CrawlIndex(index_path)
+        try:
+            state, headers, page_hash = probe(page.request, index, url)
+        except Exception as e:
+            print(f"Probe failed ({e}); fetching the article.")
+            state, headers, page_hash = None, {}, None  # fall back to a full fetch
+        if state == UNCHANGED and os.path.exists(OUTPUT_FILE):
+            index.update(url, headers, page_hash)
+            index.save()
+            print(f"Article unchanged since last run, keeping {OUTPUT_FILE}: {url}")
+            browser.close()
+            return
 
         print(f"Opening article: {url}")
 
@@ -19,18 +61,34 @@ def scrape_genai_news():
         page.goto(url)
 
         # Step 5: Extract title and content
-        title = page.locator("h1").inner_text()
-        paragraphs = page.locator("article p").all_inner_texts()
-        content = "\n\n".join(paragraphs)
+        title, content = extract_article(page)
 
         # Step 6: Save to file
-        with open("genai_news.txt", "w", encoding="utf-8") as f:
+        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
             f.write(title + "\n\n" + content)
 
-        print("✅ Article saved to genai_news.txt")
+        index.update(url, headers, page_hash)
+        index.save()
+        print(f"✅ Article saved to {OUTPUT_FILE}")
+        print(f"Requests: {routes.summary()}")
 
         browser.close()
 
 
 if __name__ == "__main__":
-    scrape_genai_news()
+    import argparse
+    import asyncio
+
+    ap = argparse.ArgumentParser(description="Scrape GenAI articles from Medium.")
+    ap.add_argument("--crawl", type=int, metavar="N", help="crawl the top N results instead of the first one")
+    ap.add_argument("--concurrency", type=int, default=4, help="pages open at once in crawl mode")
+    ap.add_argument("--output", default="genai_news.jsonl", help="JSONL output in crawl mode (appended, resumable)")
+    ap.add_argument("--index", help="crawl mode: URL/ETag/hash index file; only new or changed articles are fetched")
+    args = ap.parse_args()
+
+    if args.crawl:
+        from medium_crawler import crawl
+        asyncio.run(crawl(SEARCH_QUERY, args.crawl, args.output, concurrency=args.concurrency,
+                          index_path=args.index))
+    else:
+        scrape_genai_news()
@@ -7,61 +7,178 @@ mom_auto_playwright.py
 - Converts Markdown -> WhatsApp formatting
 - Sends to a WhatsApp group via Playwright (persistent login)
 - Saves a local timestamped copy
+
+Heavy dependencies (googleapiclient, openai, playwright) are imported on first
+use, so each step only pays for what it needs:
+
+    python MOM_Automation.py extract --out raw.md   # Sheets only
+    python MOM_Automation.py rephrase raw.md        # OpenAI only
+    python MOM_Automation.py send MoM_x.md          # Playwright only
+    python MOM_Automation.py [all]                  # the full run
+    python MOM_Automation.py daemon --interval 900  # keeps Sheets/OpenAI clients warm between runs
 """
 
+import argparse
 import os
-import re
+import sys
 import time
+from collections import Counter
 from datetime import datetime
-from typing import List
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
 
-# Google Sheets API
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+# Google Sheets API, OpenAI (>=1.0) and Playwright are imported lazily (see get_* below).
 
-# OpenAI (>=1.0)
-from openai import OpenAI
-client = OpenAI()
-
-# Playwright
-from playwright.sync_api import sync_playwright
+import chat_format
+from mom_state import MomState, row_hash, sheet_revision
+from pipeline import Pipeline, print_stats
+from rephrase import RephraseCache, iter_sections, rephrase_section
+from wa_queue import Outbox
+# Playwright page helpers re-exported for scripts / benchmarks
+from wa_delivery import (GroupResult, WhatsAppSession, find_message_box, open_whatsapp,  # noqa: F401
+                         print_report, select_group, send_chunks)
 
 # ---------------- CONFIG ----------------
 SERVICE_ACCOUNT_FILE = "gsa-credentials.json"
 SPREADSHEET_ID = "1Q1M-zmc0HkpEAW0Fp_i8GVgAqKfcNYTqBeSHS4lyc3c"
 SHEET_NAME = "DSM"
+# A1 ranges to read; several ranges (any sheets) are fetched in one call. A bare
+# sheet name reads the whole sheet, so rows and columns added later are not missed.
+SHEET_RANGES = [SHEET_NAME]
 
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-client.api_key = OPENAI_API_KEY
 OPENAI_MODEL = "gpt-3.5-turbo-instruct"
+# "single": one prompt for the whole MoM; "sections": split by section, rephrase
+# concurrently and cache each section (for long MoMs / context limits). In
+# "sections" mode main() streams sections through run_pipeline(), so sending
+# starts as soon as the first section is rephrased.
+REPHRASE_MODE = os.environ.get("MOM_REPHRASE_MODE", "single")
+# "sections" mode calls the chat completions API; OPENAI_MODEL above is a
+# completions-only (instruct) model, so it gets its own chat model.
+REPHRASE_MODEL = os.environ.get("MOM_REPHRASE_MODEL", "gpt-4o-mini")
+REPHRASE_CONCURRENCY = 4
+REPHRASE_CACHE = "rephrase_cache.json"
 
 WHATSAPP_GROUP_NAME = "SE - AI-B2 - 1"
+# Every group the MoM is posted to, from one logged-in browser session.
+WHATSAPP_GROUPS = [WHATSAPP_GROUP_NAME]
+WHATSAPP_URL = os.environ.get("WHATSAPP_URL", "https://web.whatsapp.com")
 WA_STORAGE = "wa_state.json"
 OUTPUT_DIR = "."
 MAX_WA_CHUNK = 4000
+# Only rows added or edited since the last successful run are rephrased and sent.
+INCREMENTAL = os.environ.get("MOM_FULL_RUN") != "1"
+STATE_FILE = "mom_state.json"
+# Durable outbox of WhatsApp chunks; an interrupted send resumes from here on the next run.
+OUTBOX_FILE = "wa_outbox.sqlite3"
+WA_RATE_PER_MIN = float(os.environ.get("WA_RATE_PER_MIN", "20"))
+WA_MAX_ATTEMPTS = 5
 # -----------------------------------------
 
 # ---------- Google Sheets (preserve formatting) ----------
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets.readonly",
+    # Only for reading the file version in incremental mode.
+    "https://www.googleapis.com/auth/drive.metadata.readonly",
+]
+
+# Discovery documents are kept on disk and every service is built once per process
+# over one keep-alive AuthorizedHttp, so repeated runs (daemon mode) skip discovery,
+# JSON parsing and new TLS connections. httplib2 is not thread-safe: use a service
+# from one thread at a time (the pipeline reads the sheet from the main thread).
+DISCOVERY_CACHE_DIR = ".discovery_cache"
+DISCOVERY_URL = "https://{api}.googleapis.com/$discovery/rest?version={version}"
+HTTP_TIMEOUT = 60
+
+def _discovery_document(api: str, version: str) -> str:
+    path = os.path.join(DISCOVERY_CACHE_DIR, f"{api}.{version}.json")
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    try:
+        from googleapiclient.discovery_cache import get_static_doc  # bundled with google-api-python-client>=2
+        doc = get_static_doc(api, version)
+    except ImportError:
+        doc = None
+    if doc is None:
+        import httplib2
+        resp, content = httplib2.Http(timeout=HTTP_TIMEOUT).request(DISCOVERY_URL.format(api=api, version=version))
+        if resp.status != 200:
+            raise RuntimeError(f"Discovery for {api} {version} failed: HTTP {resp.status}")
+        doc = content.decode("utf-8")
+    os.makedirs(DISCOVERY_CACHE_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(doc)
+    return doc
+
+def build_service(api: str, version: str, credentials):
+    import google_auth_httplib2
+    import httplib2
+    from googleapiclient.discovery import build_from_document
+
+    http = google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+    return build_from_document(_discovery_document(api, version), http=http)
+
+@lru_cache(maxsize=None)
+def _service_account_credentials(sa_file: str):
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_file(sa_file, scopes=SCOPES)
+
+@lru_cache(maxsize=None)
 def get_sheets_service(sa_file: str):
-    creds = service_account.Credentials.from_service_account_file(
-        sa_file, scopes=["https://www.googleapis.com/auth/spreadsheets.readonly"]
-    )
-    service = build("sheets", "v4", credentials=creds)
-    return service
+    return build_service("sheets", "v4", _service_account_credentials(sa_file))
 
-def fetch_sheet_grid(service, spreadsheet_id: str, sheet_name: str):
+@lru_cache(maxsize=None)
+def get_drive_service(sa_file: str):
+    return build_service("drive", "v3", _service_account_credentials(sa_file))
+
+# ---------- OpenAI client (built on first use) ----------
+_client = None
+
+def get_openai_client():
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=OPENAI_API_KEY)
+    return _client
+
+def __getattr__(name):
+    # ``MOM_Automation.client`` keeps working for older scripts without an import-time client.
+    if name == "client":
+        return get_openai_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Only what format_cell_to_markdown reads; without a mask includeGridData returns
+# every formatting property of every cell.
+CELL_FIELDS = ("userEnteredValue/stringValue,"
+               "textFormatRuns(startIndex,format(bold,italic)),"
+               "userEnteredFormat/textFormat(bold,italic)")
+GRID_FIELDS = f"sheets(properties/title,data(startRow,rowData/values({CELL_FIELDS})))"
+
+def fetch_sheet_grids(service, spreadsheet_id: str, ranges: Iterable[str]) -> Iterator[Tuple[str, int, dict]]:
+    """
+    Fetch several ranges in one spreadsheets.get call with a field mask.
+
+    Yields (sheet title, absolute row index, rowData) one row at a time, in range order.
+    """
     res = service.spreadsheets().get(
         spreadsheetId=spreadsheet_id,
-        ranges=[sheet_name],
-        includeGridData=True
+        ranges=list(ranges),
+        includeGridData=True,
+        fields=GRID_FIELDS,
     ).execute()
-    sheets = res.get("sheets", [])
-    if not sheets:
-        return []
-    data = sheets[0].get("data", [])
-    if not data:
-        return []
-    return data[0].get("rowData", [])
+    for sheet in res.get("sheets", []):
+        title = sheet.get("properties", {}).get("title", "")
+        for block in sheet.get("data", []):
+            start = block.get("startRow", 0)
+            rows = block.get("rowData", [])
+            for offset, row in enumerate(rows):
+                yield title, start + offset, row
+            # Drop parsed rows as we go; the response is only held for this loop.
+            rows.clear()
+
+def fetch_sheet_grid(service, spreadsheet_id: str, sheet_name: str):
+    return [row for _, _, row in fetch_sheet_grids(service, spreadsheet_id, [sheet_name])]
 
 def format_cell_to_markdown(cell: dict) -> str:
     text = cell.get("userEnteredValue", {}).get("stringValue", "")
@@ -101,19 +218,24 @@ def format_cell_to_markdown(cell: dict) -> str:
             return f"*{s}*"
         return s
 
+def row_to_markdown(row: dict) -> str:
+    cell_texts = []
+    for cell in row.get("values", []):
+        md = format_cell_to_markdown(cell)
+        if md:
+            cell_texts.append(md)
+    return " ".join(cell_texts)
+
+def iter_markdown_rows(service, spreadsheet_id: str, ranges: Iterable[str]) -> Iterator[Tuple[str, int, str]]:
+    """Stream (sheet title, row index, markdown) for every non-empty row in ``ranges``."""
+    for title, row_idx, row in fetch_sheet_grids(service, spreadsheet_id, ranges):
+        md = row_to_markdown(row)
+        if md:
+            yield title, row_idx, md
+
 def sheet_to_markdown(service, spreadsheet_id: str, sheet_name: str) -> str:
-    row_data = fetch_sheet_grid(service, spreadsheet_id, sheet_name)
-    lines = []
-    for row in row_data:
-        vals = row.get("values", [])
-        cell_texts = []
-        for cell in vals:
-            md = format_cell_to_markdown(cell)
-            if md:
-                cell_texts.append(md)
-        if cell_texts:
-            lines.append(" ".join(cell_texts))
-    return "\n\n".join(lines)
+    ranges = SHEET_RANGES if sheet_name == SHEET_NAME else [sheet_name]
+    return "\n\n".join(md for _, _, md in iter_markdown_rows(service, spreadsheet_id, ranges))
 
 # ---------- OpenAI rephrase ----------
 def rephrase_with_openai_markdown(text: str, model: str = OPENAI_MODEL) -> str:
@@ -122,7 +244,7 @@ def rephrase_with_openai_markdown(text: str, model: str = OPENAI_MODEL) -> str:
         {"role": "user", "content": f"Raw notes:\n{text}\n\nRewrite as: Title, Summary, Key Points (bulleted), Action Items (bulleted). Preserve markdown formatting."}
     ]
 
-    #resp = client.chat.completions.create(
+    #resp = get_openai_client().chat.completions.create(
      #   model=model,
       #  messages=messages,
        # temperature=0.2,
@@ -132,109 +254,205 @@ def rephrase_with_openai_markdown(text: str, model: str = OPENAI_MODEL) -> str:
 
 # ---------- Convert Markdown -> WhatsApp formatting ----------
 def markdown_to_whatsapp(md_text: str) -> str:
-    text = md_text
-    text = re.sub(r"\*\*\*([^\*]+)\*\*\*", r'*_\1_*', text)
-    text = re.sub(r"\*\*([^\*]+)\*\*", r'*\1*', text)
-    text = re.sub(r"(?<!\*)\*([^\*]+)\*(?!\*)", r'_\1_', text)
-    return text
+    # Single-pass tokenizer; see chat_format.py for Slack / Telegram targets.
+    return chat_format.markdown_to_whatsapp(md_text)
 
 # ---------- Chunking for WhatsApp ----------
 def chunk_text(text: str, max_len: int = MAX_WA_CHUNK) -> List[str]:
-    chunks = []
-    while text:
-        if len(text) <= max_len:
-            chunks.append(text)
-            break
-        idx = text.rfind("\n\n", 0, max_len)
-        if idx == -1:
-            idx = text.rfind("\n", 0, max_len)
-        if idx == -1:
-            idx = text.rfind(" ", 0, max_len)
-        if idx == -1:
-            idx = max_len
-        chunk = text[:idx].strip()
-        chunks.append(chunk)
-        text = text[idx:].strip()
-    return chunks
+    # Offset-based, never splits a *bold*/_italic_ span, measures UTF-16 units like WhatsApp Web.
+    return list(chat_format.iter_chunks(text, max_len))
 
 # ---------- Playwright send to WhatsApp ----------
 def send_whatsapp_playwright(message: str, group_name: str, storage_state: str = WA_STORAGE):
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        if os.path.exists(storage_state):
-            context = browser.new_context(storage_state=storage_state)
-            print("Loaded existing WhatsApp login state.")
-        else:
-            context = browser.new_context()
-        
-        page = context.new_page()
-        page.goto("https://web.whatsapp.com")
-
-        if not os.path.exists(storage_state):
-            print("Scan QR code for WhatsApp Web (you have 2 minutes)...")
-            page.wait_for_selector("span[title]", timeout=120_000)
-            print("QR scanned. Saving login state...")
-            context.storage_state(path=storage_state)
-            print(f"Saved state to {storage_state}")
-        else:
-            page.wait_for_selector("span[title]", timeout=30_000)
-
-        # Select WhatsApp group
-        group_sel = f"span[title='{group_name}']"
-        print(f"group_sel==>{group_sel}")
+    results = send_whatsapp_groups(message, [group_name], storage_state)
+    if not results[0].ok:
+        raise RuntimeError(results[0].error)
+
+def send_whatsapp_groups(message: str, groups: List[str], storage_state: str = WA_STORAGE,
+                         batch: str = None) -> List[GroupResult]:
+    """
+    Queue ``message`` for ``groups`` in the outbox and drain it from one browser session.
+    Chunks already sent (by this or an interrupted earlier run) are not sent again.
+    ``batch`` identifies the send (default: a new one per call).
+    """
+    outbox = Outbox(OUTBOX_FILE)
+    try:
+        if message:
+            batch = outbox.enqueue(message, groups, lambda m: chunk_text(m, MAX_WA_CHUNK),
+                                   batch or f"send@{datetime.now():%Y%m%d_%H%M%S_%f}")
+        return drain_outbox(outbox, batch, storage_state)
+    finally:
+        outbox.close()
+
+def drain_outbox(outbox: Outbox, batch: str = None, storage_state: str = WA_STORAGE) -> List[GroupResult]:
+    """Send everything queued; returns per-group results for ``batch`` (if given)."""
+    stats, setup_seconds = {}, 0.0
+    if outbox.pending_count():
+        with WhatsAppSession(storage_state, url=WHATSAPP_URL) as wa:
+            stats = outbox.drain(wa, rate_per_minute=WA_RATE_PER_MIN, max_attempts=WA_MAX_ATTEMPTS)
+            setup_seconds = wa.setup_seconds
+    if batch is None:
+        return []
+    results = []
+    for group, counts in outbox.batch_status(batch).items():
+        missing = sum(n for status, n in counts.items() if status != "sent")
+        results.append(GroupResult(group, not missing, counts.get("sent", 0),
+                                   stats.get(group, {}).get("seconds", 0.0),
+                                   f"{missing} chunk(s) not delivered" if missing else None))
+    print_report(results, setup_seconds)
+    return results
+
+# ---------- Streaming pipeline (REPHRASE_MODE == "sections") ----------
+class _PipelineSender:
+    """
+    Last pipeline stage: appends each rephrased section to the MoM file and
+    delivers it through the outbox. The browser session and the SQLite
+    connection are opened lazily in the stage's own thread (both are
+    thread-bound) and closed there via ``close``.
+    """
+
+    def __init__(self, filename_md: str, run_id: str):
+        self.filename_md = filename_md
+        self.run_id = run_id
+        self.out = None
+        self.outbox = None
+        self.wa = None
+        self.results: Dict[str, GroupResult] = {}
+
+    def __call__(self, item):
+        n, md, wa_text = item
+        if self.out is None:
+            self.out = open(self.filename_md, "w", encoding="utf-8")
+            self.outbox = Outbox(OUTBOX_FILE)
+        self.out.write(md + "\n\n")
+        self.out.flush()
+
+        # ``n`` is the section's position in the source, so a retried run gives each section
+        # the same batch id even when an earlier section failed (and was skipped) last time.
+        batch = self.outbox.enqueue(wa_text, WHATSAPP_GROUPS, lambda m: chunk_text(m, MAX_WA_CHUNK),
+                                    f"{self.run_id}/{n}")
+        if self.wa is None and self.outbox.pending_count():
+            self.wa = WhatsAppSession(WA_STORAGE, url=WHATSAPP_URL).__enter__()
+        stats = self.outbox.drain(self.wa, rate_per_minute=WA_RATE_PER_MIN,
+                                  max_attempts=WA_MAX_ATTEMPTS) if self.wa else {}
+        for group, counts in self.outbox.batch_status(batch).items():
+            r = self.results.setdefault(group, GroupResult(group, True, 0, 0.0))
+            missing = sum(n for status, n in counts.items() if status != "sent")
+            r.chunks_sent += counts.get("sent", 0)
+            r.seconds += stats.get(group, {}).get("seconds", 0.0)
+            if missing:
+                r.ok = False
+                r.error = "some chunks not delivered"
+        return item
+
+    def close(self):
         try:
-            page.locator(group_sel).click(timeout=15000)
-        except Exception:
-            anchors = page.locator("div[role='row'] span[title]")
-            found = False
-            for i in range(anchors.count()):
-                t = anchors.nth(i).inner_text()
-                if group_name.lower() in t.lower():
-                    anchors.nth(i).click()
-                    found = True
-                    break
-            if not found:
-                raise RuntimeError(f"Could not find WhatsApp group named '{group_name}'.")
-
-        # Locate input box
-        input_selectors = [
-            "div[title='Type a message']",
-            "div[contenteditable='true'][data-tab='1']",
-            "div[contenteditable='true']"
-        ]
-        msg_box = None
-        for sel in input_selectors:
-            if page.locator(sel).count() > 0:
-                msg_box = page.locator(sel).first
-                break
-        if not msg_box:
-            raise RuntimeError("Could not locate WhatsApp message input box.")
-
-        # Send in chunks
-        chunks = chunk_text(message, MAX_WA_CHUNK)
-        print(f"chunks==>{chunks}")
-        print(f"page==>{page}")
-        for chunk in chunks:
-            msg_box.click()
-            page.keyboard.insert_text(chunk)
-            page.keyboard.press("Enter")
-            time.sleep(0.8)
-
-        print("✅ Message sent to WhatsApp group.")
-        context.close()
-        browser.close()
+            if self.wa is not None:
+                self.wa.__exit__(None, None, None)
+        finally:
+            if self.out is not None:
+                self.out.close()
+                self.outbox.close()
+
+
+def run_pipeline(service, state: MomState, revision):
+    """
+    fetch rows -> sections -> rephrase (REPHRASE_CONCURRENCY workers) -> convert -> save + send,
+    connected by bounded queues; prints per-stage timing, throughput and queue depth.
+    """
+    seen = Counter()
+
+    def count_all(rows):
+        for title, idx, md in rows:
+            seen[row_hash(title, md)] += 1
+            yield title, idx, md
+
+    rows = iter_markdown_rows(service, SPREADSHEET_ID, SHEET_RANGES)
+    rows = state.iter_changed(rows, seen) if INCREMENTAL else count_all(rows)
+    sections = enumerate(iter_sections(md for _, _, md in rows))
+
+    cache = RephraseCache(REPHRASE_CACHE)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    sender = _PipelineSender(os.path.join(OUTPUT_DIR, f"MoM_{ts}.md"), state.run_id(revision))
+    errors = []
+
+    p = Pipeline(maxsize=REPHRASE_CONCURRENCY * 2,
+                 on_error=lambda stage, e: errors.append((stage, e)) or print(f"❌ {stage}: {e}"))
+    p.stage("rephrase", lambda s: (s[0], rephrase_section(get_openai_client(), REPHRASE_MODEL, s[1], cache)),
+            workers=REPHRASE_CONCURRENCY)
+    p.stage("convert", lambda s: (s[0], s[1], markdown_to_whatsapp(s[1])))
+    p.stage("send", sender, ordered=True, on_close=sender.close)
+
+    print("2) Streaming sheet -> rephrase -> WhatsApp...")
+    try:
+        stats = p.run(sections)
+    finally:
+        cache.save()
+    print_stats(stats)
+    if sender.results:
+        print_report(list(sender.results.values()))
+
+    if stats[0]["items"] == 0:
+        print("No new text found in the sheet.")
+    if errors:
+        print("Some sections failed; state not updated so their rows are retried next run.")
+        return
+    if not all(r.ok for r in sender.results.values()):
+        # Not committed: the next run retries the failed chunks, and the same run id
+        # keeps the sections that did go out from being sent again.
+        print(f"Some chunks were not delivered; they stay queued in {OUTBOX_FILE} "
+              "and are retried on the next run.")
+        return
+    state.commit(revision, seen)
+    print("All done.")
 
 # ---------- Main pipeline ----------
 def main():
     print("1) Connecting to Google Sheets...")
     service = get_sheets_service(SERVICE_ACCOUNT_FILE)
 
+    with Outbox(OUTBOX_FILE) as outbox:
+        retried = outbox.retry_failed()
+        if retried:
+            print(f"Re-queued {retried} failed or blocked chunk(s) from earlier runs.")
+        if outbox.pending_count():
+            print(f"Resuming {outbox.pending_count()} undelivered chunk(s) from the last run...")
+            drain_outbox(outbox)
+
+    state = MomState(STATE_FILE)
+    revision = None
+    if INCREMENTAL:
+        revision = sheet_revision(get_drive_service(SERVICE_ACCOUNT_FILE), SPREADSHEET_ID)
+        if revision is not None and revision == state.revision:
+            print(f"Sheet unchanged since last run (revision {revision}). Exiting.")
+            return
+
+    if REPHRASE_MODE == "sections":
+        run_pipeline(service, state, revision)
+        return
+
     print("2) Reading sheet and extracting formatted text...")
-    md_text = sheet_to_markdown(service, SPREADSHEET_ID, SHEET_NAME)
+    rows = list(iter_markdown_rows(service, SPREADSHEET_ID, SHEET_RANGES))
+    if INCREMENTAL:
+        todo, row_hashes = state.changed_rows(rows)
+        print(f"{len(todo)} of {len(rows)} rows are new or edited since the last run.")
+    else:
+        todo, row_hashes = rows, state.changed_rows(rows)[1]
+    md_text = "\n\n".join(md for _, _, md in todo)
     if not md_text.strip():
-        print("No text found in the sheet. Exiting.")
+        print("No new text found in the sheet. Exiting.")
+        state.commit(revision, row_hashes)
         return
 
+    batch = state.run_id(revision)
+    with Outbox(OUTBOX_FILE) as outbox:
+        if outbox.batch_status(batch):
+            # An earlier attempt of this run already queued the MoM (and the drain above retried
+            # it); re-rephrasing could produce different text and post it a second time.
+            print(f"This run's MoM is already in {OUTBOX_FILE}; not rephrasing it again.")
+            _finish_single(outbox, batch, state, revision, row_hashes)
+            return
+
     print("=== Raw extracted (markdown) ===")
     print(md_text[:1000] + ("..." if len(md_text) > 1000 else ""))
 
@@ -250,10 +468,93 @@ def main():
     print(f"Saved rephrased markdown to {filename_md}")
 
     wa_text = markdown_to_whatsapp(polished_md)
-    print("\n4) Sending to WhatsApp group...")
-    send_whatsapp_playwright(wa_text, WHATSAPP_GROUP_NAME, storage_state=WA_STORAGE)
+    print(f"\n4) Sending to {len(WHATSAPP_GROUPS)} WhatsApp group(s)...")
+    with Outbox(OUTBOX_FILE) as outbox:
+        outbox.enqueue(wa_text, WHATSAPP_GROUPS, lambda m: chunk_text(m, MAX_WA_CHUNK), batch)
+        _finish_single(outbox, batch, state, revision, row_hashes)
 
+def _finish_single(outbox: Outbox, batch: str, state: MomState, revision, row_hashes: Counter):
+    """Deliver ``batch``; the run is only committed once every chunk went out."""
+    results = drain_outbox(outbox, batch, storage_state=WA_STORAGE)
+    if not all(r.ok for r in results):
+        print("Some chunks were not delivered; they stay queued in "
+              f"{OUTBOX_FILE} and are retried on the next run.")
+        return
+    state.commit(revision, row_hashes)
     print("All done.")
 
+# ---------- CLI ----------
+def _read(path: str) -> str:
+    if path == "-":
+        return sys.stdin.read()
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+def _write(path: str, text: str):
+    if path == "-":
+        sys.stdout.write(text)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"Saved to {path}", file=sys.stderr)
+
+def cmd_extract(args):
+    service = get_sheets_service(SERVICE_ACCOUNT_FILE)
+    md_text = "\n\n".join(md for _, _, md in iter_markdown_rows(service, SPREADSHEET_ID, SHEET_RANGES))
+    _write(args.out, md_text)
+
+def cmd_rephrase(args):
+    md_text = _read(args.input)
+    if REPHRASE_MODE == "sections":
+        from rephrase import rephrase_markdown
+        polished_md = rephrase_markdown(md_text, REPHRASE_MODEL, REPHRASE_CONCURRENCY, REPHRASE_CACHE)
+    else:
+        polished_md = rephrase_with_openai_markdown(md_text)
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    _write(args.out or os.path.join(OUTPUT_DIR, f"MoM_{ts}.md"), polished_md)
+
+def cmd_send(args):
+    results = send_whatsapp_groups(markdown_to_whatsapp(_read(args.input)), args.group or WHATSAPP_GROUPS,
+                                   storage_state=WA_STORAGE)
+    sys.exit(0 if all(r.ok for r in results) else 1)
+
+def cmd_daemon(args):
+    # One process for every scheduled run: Sheets/Drive services, credentials (and their
+    # access token), HTTP connections and imports are set up once and reused.
+    while True:
+        t0 = time.perf_counter()
+        try:
+            main()
+        except Exception as e:
+            print(f"Run failed: {e}")
+        elapsed = time.perf_counter() - t0
+        print(f"Run took {elapsed:.1f}s; next run in {max(0.0, args.interval - elapsed):.0f}s.")
+        time.sleep(max(0.0, args.interval - elapsed))
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(description="Google Sheets MoM -> OpenAI rephrase -> WhatsApp.")
+    sub = ap.add_subparsers(dest="command")
+    p = sub.add_parser("extract", help="export the sheet as Markdown (no OpenAI / browser)")
+    p.add_argument("--out", default="-", help="output file (default: stdout)")
+    p.set_defaults(func=cmd_extract)
+    p = sub.add_parser("rephrase", help="rephrase a Markdown file")
+    p.add_argument("input", help="Markdown file, or - for stdin")
+    p.add_argument("--out", help="output file (default: MoM_<timestamp>.md)")
+    p.set_defaults(func=cmd_rephrase)
+    p = sub.add_parser("send", help="convert a Markdown file and post it to WhatsApp")
+    p.add_argument("input", help="Markdown file, or - for stdin")
+    p.add_argument("--group", action="append", help="group name (repeatable; default: WHATSAPP_GROUPS)")
+    p.set_defaults(func=cmd_send)
+    p = sub.add_parser("all", help="incremental extract -> rephrase -> send (default)")
+    p.set_defaults(func=lambda args: main())
+    p = sub.add_parser("daemon", help="run 'all' every --interval seconds, keeping clients warm")
+    p.add_argument("--interval", type=float, default=900, help="seconds between runs (default: 900)")
+    p.set_defaults(func=cmd_daemon)
+    return ap
+
 if __name__ == "__main__":
-    main()
+    args = build_parser().parse_args()
+    if args.command is None:
+        main()
+    else:
+        args.func(args)
@@ -0,0 +1,360 @@
+"""
+chat_format.py
+
+Single-pass Markdown -> chat markup converter (WhatsApp, Slack, Telegram).
+
+Each line is scanned once. Block syntax (headings, bullet / numbered lists,
+``` fences) is recognised at the start of the line; inline syntax is split
+into text, code spans and `*` / `_` delimiter runs, and runs are paired with
+a CommonMark-style delimiter stack:
+
+- a closer pairs with the nearest open run of the same character
+- 3+3 -> bold-italic, 2+2 -> bold, otherwise italic; leftovers keep pairing
+- CommonMark's "rule of 3": a run that can both open and close does not pair
+  when the two run lengths add up to a multiple of 3 (so *a**b**c* nests)
+- openers of the other character sitting above the matched one can no longer
+  close and become literal text (keeps the output properly nested)
+
+Every delimiter is pushed and popped at most once, so conversion is linear in
+the input size. Unpaired markers are emitted as literal text.
+"""
+
+import re
+from typing import Callable, Dict, List, Sequence
+
+_BULLET_RE = re.compile(r"([ \t]*)([-*+])[ \t]+")
+_ORDERED_RE = re.compile(r"([ \t]*)(\d{1,9})([.)])[ \t]+")
+_HEADING_RE = re.compile(r"(#{1,6})[ \t]+")
+_FENCE_RE = re.compile(r"[ \t]*(```|~~~)")
+_INLINE_SPECIAL_RE = re.compile(r"[`*_]")
+
+
+class ChatTarget:
+    """Markup of one chat app. ``escape`` is applied to literal text only."""
+
+    def __init__(self, name: str, bold: str, italic: str, code_open: str, code_close: str,
+                 fence: str = "```", bullet: str = "• ",
+                 escape: Callable[[str], str] = lambda s: s,
+                 escape_code: Callable[[str], str] = lambda s: s):
+        self.name = name
+        self.bold = bold
+        self.italic = italic
+        self.code_open = code_open
+        self.code_close = code_close
+        self.fence = fence
+        self.bullet = bullet
+        self.escape = escape
+        self.escape_code = escape_code
+
+
+_TG_SPECIAL = re.compile(r"([_*\[\]()~`>#+\-=|{}.!\\])")
+_TG_CODE_SPECIAL = re.compile(r"([`\\])")
+
+
+def _slack_escape(s: str) -> str:
+    return s.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+TARGETS: Dict[str, ChatTarget] = {
+    "whatsapp": ChatTarget("whatsapp", bold="*", italic="_", code_open="```", code_close="```"),
+    "slack": ChatTarget("slack", bold="*", italic="_", code_open="`", code_close="`",
+                        escape=_slack_escape, escape_code=_slack_escape),
+    # Telegram MarkdownV2: every special character in plain text must be escaped.
+    "telegram": ChatTarget("telegram", bold="*", italic="_", code_open="`", code_close="`",
+                           escape=lambda s: _TG_SPECIAL.sub(r"\\\1", s),
+                           escape_code=lambda s: _TG_CODE_SPECIAL.sub(r"\\\1", s)),
+}
+
+
+class _Delim:
+    __slots__ = ("char", "count", "orig", "can_open", "can_close", "pos", "opens", "closes")
+
+    def __init__(self, char: str, count: int, can_open: bool, can_close: bool, pos: int):
+        self.char = char
+        self.count = count          # markers not yet paired
+        self.orig = count
+        self.can_open = can_open
+        self.can_close = can_close
+        self.pos = pos
+        self.opens: List[int] = []  # strengths opened here, outermost first
+        self.closes: List[int] = [] # strengths closed here, innermost first
+
+
+def _flanking(line: str, start: int, end: int, char: str):
+    before = line[start - 1] if start > 0 else " "
+    after = line[end] if end < len(line) else " "
+    can_open = not after.isspace()
+    can_close = not before.isspace()
+    if char == "_":
+        # snake_case and other intraword underscores are never emphasis
+        can_open = can_open and not before.isalnum()
+        can_close = can_close and not after.isalnum()
+    return can_open, can_close
+
+
+def _render_inline(line: str, target: ChatTarget, out: List[str]):
+    tokens: list = []   # str | _Delim | ("code", text)
+    stacks = {"*": [], "_": []}
+    no_closer_from: Dict[int, int] = {}  # backtick run length -> search start known to fail
+    pending_start = 0
+    i, n = 0, len(line)
+
+    while i < n:
+        m = _INLINE_SPECIAL_RE.search(line, i)
+        if m is None:
+            break
+        i = m.start()
+        ch = line[i]
+        if ch == "`":
+            j = i
+            while j < n and line[j] == "`":
+                j += 1
+            width = j - i
+            close = -1
+            if no_closer_from.get(width, n + 1) > j:
+                close = line.find("`" * width, j)
+                while close != -1 and (close + width < n and line[close + width] == "`"):
+                    k = close + width
+                    while k < n and line[k] == "`":
+                        k += 1
+                    close = line.find("`" * width, k)
+                if close == -1:
+                    no_closer_from[width] = j
+            if close == -1:
+                i = j
+                continue
+            if pending_start < i:
+                tokens.append(line[pending_start:i])
+            tokens.append(("code", line[j:close]))
+            i = pending_start = close + width
+            continue
+        if ch == "*" or ch == "_":
+            j = i
+            while j < n and line[j] == ch:
+                j += 1
+            if pending_start < i:
+                tokens.append(line[pending_start:i])
+            can_open, can_close = _flanking(line, i, j, ch)
+            d = _Delim(ch, j - i, can_open, can_close, len(tokens))
+            tokens.append(d)
+
+            if can_close:
+                stack = stacks[ch]
+                other = stacks["_" if ch == "*" else "*"]
+                while d.count and stack:
+                    opener = stack[-1]
+                    if ((opener.can_close or d.can_open) and (opener.orig + d.orig) % 3 == 0
+                            and (opener.orig % 3 or d.orig % 3)):
+                        break
+                    strength = 3 if opener.count >= 3 and d.count >= 3 else 2 if opener.count >= 2 and d.count >= 2 else 1
+                    opener.count -= strength
+                    d.count -= strength
+                    opener.opens.insert(0, strength)
+                    d.closes.append(strength)
+                    # Other-character openers inside this span can no longer close.
+                    while other and other[-1].pos > opener.pos:
+                        other.pop()
+                    if opener.count == 0:
+                        stack.pop()
+            if can_open and d.count:
+                stacks[ch].append(d)
+            i = pending_start = j
+    if pending_start < n:
+        tokens.append(line[pending_start:])
+
+    def wrap(strength: int, closing: bool) -> str:
+        if strength == 3:
+            return target.italic + target.bold if closing else target.bold + target.italic
+        return target.bold if strength == 2 else target.italic
+
+    for tok in tokens:
+        if isinstance(tok, str):
+            out.append(target.escape(tok))
+        elif isinstance(tok, _Delim):
+            # Pairs closed here come first (innermost first), leftovers are literal,
+            # pairs opened here go last (outermost first).
+            for s in tok.closes:
+                out.append(wrap(s, True))
+            if tok.count:
+                out.append(target.escape(tok.char * tok.count))
+            for s in tok.opens:
+                out.append(wrap(s, False))
+        else:
+            out.append(target.code_open + target.escape_code(tok[1]) + target.code_close)
+
+
+def convert(md_text: str, target: str = "whatsapp") -> str:
+    """Convert Markdown to the markup of ``target`` ("whatsapp", "slack" or "telegram")."""
+    t = TARGETS[target]
+    out: List[str] = []
+    in_fence = False
+    for line_no, line in enumerate(md_text.split("\n")):
+        if line_no:
+            out.append("\n")
+        if _FENCE_RE.match(line):
+            # Language tags are dropped; none of the targets highlight code.
+            in_fence = not in_fence
+            out.append(t.fence)
+            continue
+        if in_fence:
+            out.append(t.escape_code(line))
+            continue
+
+        m = _HEADING_RE.match(line)
+        if m:
+            out.append(t.bold)
+            _render_inline(line[m.end():].rstrip(" #"), t, out)
+            out.append(t.bold)
+            continue
+        m = _BULLET_RE.match(line)
+        if m:
+            out.append(m.group(1) + t.bullet)
+            line = line[m.end():]
+        else:
+            m = _ORDERED_RE.match(line)
+            if m:
+                out.append(m.group(1) + m.group(2) + t.escape(m.group(3)) + " ")
+                line = line[m.end():]
+        _render_inline(line, t, out)
+    return "".join(out)
+
+
+def markdown_to_whatsapp(md_text: str) -> str:
+    return convert(md_text, "whatsapp")
+
+
+def markdown_to_slack(md_text: str) -> str:
+    return convert(md_text, "slack")
+
+
+def markdown_to_telegram(md_text: str) -> str:
+    return convert(md_text, "telegram")
+
+
+# ---------- Chunking for chat message limits ----------
+_ASTRAL_RE = re.compile("[\U00010000-\U0010FFFF]")
+_SPAN_SCAN_RE = re.compile(r"[*_~ ]")
+_FENCE = "```"
+
+
+def utf16_len(s: str) -> int:
+    """Length as JavaScript (WhatsApp Web, Telegram) counts it: UTF-16 code units."""
+    return len(s) + len(_ASTRAL_RE.findall(s))
+
+
+def _fit_end(text: str, start: int, budget: int, length: Callable[[str], int]) -> int:
+    """Largest end such that length(text[start:end]) <= budget (budget >= 1)."""
+    end = min(len(text), start + budget)
+    while end > start + 1:
+        over = length(text[start:end]) - budget
+        if over <= 0:
+            break
+        end -= max(1, over // 2)
+    return end
+
+
+def _span_state(text: str, lo: int, hi: int, markers: str, open_at_lo: Sequence[str] = ()):
+    """
+    Scan text[lo:hi] (one line; ``open_at_lo`` = markers already open at ``lo``,
+    e.g. carried over from the previous chunk). Returns (last space position
+    where no marker span is open or -1, markers open at ``hi``). A marker that
+    is already open does not open again, so at most one of each is open.
+    """
+    open_ = list(open_at_lo)
+    last_safe = -1
+    for m in _SPAN_SCAN_RE.finditer(text, lo, hi):
+        p = m.start()
+        ch = text[p]
+        if ch == " ":
+            if not open_:
+                last_safe = p
+            continue
+        if ch not in markers:
+            continue
+        before = text[p - 1] if p > 0 else " "
+        after = text[p + 1] if p + 1 < len(text) else " "
+        if ch in open_:
+            if not before.isspace():
+                while open_[-1] != ch:
+                    open_.pop()
+                open_.pop()
+        elif not after.isspace() and (before.isspace() or not before.isalnum()):
+            open_.append(ch)
+    return last_safe, open_
+
+
+def iter_chunks(text: str, max_len: int = 4000, markers: str = "*_~",
+                length: Callable[[str], int] = utf16_len):
+    """
+    Yield chunks of ``text`` no longer than ``max_len`` as measured by ``length``.
+
+    Works from offsets (the remainder is never re-sliced), prefers paragraph,
+    line and then word boundaries, and never breaks inside a formatting span:
+    a span is only split when a single span is longer than a whole chunk, and
+    then it is closed at the end of the chunk and reopened in the next one.
+    Code fences cut in half are closed and reopened the same way.
+
+    Raises ValueError if ``max_len`` leaves no room for text once the fence and
+    span markers used in ``text`` are reopened and closed.
+    """
+    used = sum(m in text for m in markers)
+    reserve = 2 * used + (2 * (len(_FENCE) + 1) if _FENCE in text else 0)
+    if max_len <= reserve:
+        raise ValueError(f"max_len={max_len} is too small: reopening and closing fences "
+                         f"and markers can take {reserve}")
+    n = len(text)
+    start = 0
+    while start < n and text[start].isspace():
+        start += 1
+    prefix = ""
+    carried: List[str] = []  # spans reopened at the start of this chunk
+    in_fence = False
+    while start < n:
+        budget = max_len - length(prefix)
+        if in_fence or text.find(_FENCE, start, start + budget) != -1:
+            budget -= len(_FENCE) + 1  # room to close a fence cut in half
+        end = _fit_end(text, start, budget, length)
+        if end >= n:
+            yield prefix + text[start:n].rstrip()
+            return
+
+        cut, carry = -1, []
+        for sep in ("\n\n", "\n"):
+            idx = text.rfind(sep, start, end)
+            if idx > start:
+                cut = idx
+                break
+        if cut == -1:
+            line_start = max(text.rfind("\n", start, end) + 1, start)
+            seed = carried if line_start == start else ()
+            safe_space = _span_state(text, line_start, end, markers, seed)[0]
+            if safe_space > start:
+                cut = safe_space
+            else:
+                # One unbreakable span / word longer than the chunk: close and reopen it.
+                # Trimming for the closers can change which spans are open, so repeat until it fits.
+                reserved = 0
+                while True:
+                    end = _fit_end(text, start, budget - reserved, length)
+                    open_at_end = _span_state(text, line_start, end, markers, seed)[1]
+                    closing = length("".join(open_at_end))
+                    if closing <= reserved:
+                        break
+                    reserved = closing
+                cut, carry = end, open_at_end
+
+        piece = text[start:cut]
+        fence_open = in_fence ^ (piece.count(_FENCE) % 2 == 1)
+        chunk = prefix + piece.rstrip()
+        if carry:
+            chunk += "".join(reversed(carry))
+        if fence_open:
+            chunk += "\n" + _FENCE
+        yield chunk
+
+        start = cut
+        while start < n and text[start].isspace() and not carry:
+            start += 1
+        prefix = (_FENCE + "\n" if fence_open else "") + "".join(carry)
+        carried = carry
+        in_fence = fence_open
@@ -0,0 +1,80 @@
+"""
+mom_state.py
+
+Run-to-run state for incremental MoM runs: the sheet revision seen last time
+and a content hash per row that has already been rephrased and sent.
+
+Rows are identified by content, not position, so inserting a row above
+existing ones does not make them look edited. An edited row hashes
+differently and is treated as new.
+
+A run counter, bumped on every commit, gives each run its own id for the
+WhatsApp outbox: a retry of an uncommitted run reuses it, the next run does not.
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+def row_hash(sheet_title: str, markdown: str) -> str:
+    return hashlib.sha256(f"{sheet_title}\x00{markdown}".encode("utf-8")).hexdigest()
+
+
+class MomState:
+    def __init__(self, path: str):
+        self.path = path
+        self.revision: Optional[str] = None
+        self.row_hashes: Counter = Counter()
+        self.runs = 0
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            self.revision = raw.get("revision")
+            self.row_hashes = Counter(raw.get("row_hashes", {}))
+            self.runs = raw.get("runs", 0)
+
+    def run_id(self, revision: Optional[str]) -> str:
+        """Id of the run in progress (outbox batch id); changes once the run is committed."""
+        return f"run{self.runs + 1}@{revision or '-'}"
+
+    def changed_rows(self, rows: Iterable[Tuple[str, int, str]]) -> Tuple[List[Tuple[str, int, str]], Counter]:
+        """
+        Split (sheet title, row index, markdown) rows into the ones not sent before.
+
+        Returns (new or edited rows, hash counts of the full current sheet). Duplicate
+        rows are counted, so a second identical row is still treated as new.
+        """
+        seen = Counter()
+        changed = list(self.iter_changed(rows, seen))
+        return changed, seen
+
+    def iter_changed(self, rows: Iterable[Tuple[str, int, str]], seen: Counter) -> Iterator[Tuple[str, int, str]]:
+        """Streaming ``changed_rows``: yields new or edited rows, counting every row into ``seen``."""
+        for title, idx, md in rows:
+            h = row_hash(title, md)
+            seen[h] += 1
+            if seen[h] > self.row_hashes.get(h, 0):
+                yield title, idx, md
+
+    def commit(self, revision: Optional[str], row_hashes: Counter):
+        """Record a successful run; call only after the rows were delivered."""
+        self.revision = revision
+        self.row_hashes = Counter(row_hashes)
+        self.runs += 1
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"revision": revision, "row_hashes": dict(self.row_hashes), "runs": self.runs}, f)
+        os.replace(tmp, self.path)
+
+
+def sheet_revision(drive_service, spreadsheet_id: str) -> Optional[str]:
+    """Drive file version of the spreadsheet (bumps on every edit); None if unavailable."""
+    try:
+        meta = drive_service.files().get(fileId=spreadsheet_id, fields="version,modifiedTime").execute()
+    except Exception as e:
+        print(f"Could not read sheet revision ({e}); falling back to row hashes only.")
+        return None
+    return f"{meta.get('version')}@{meta.get('modifiedTime')}"
@@ -0,0 +1,181 @@
+"""
+pipeline.py
+
+Small thread-based producer/consumer pipeline with bounded queues.
+
+Each stage runs ``workers`` threads that take items from the previous stage's
+queue and put results on the next one, so later stages start as soon as the
+first item is ready and a slow stage back-pressures the ones before it.
+An ``ordered`` stage sees items in source order again (reorder buffer), which
+is what the WhatsApp send stage needs after a multi-worker rephrase stage.
+
+    p = Pipeline(maxsize=4)
+    p.stage("rephrase", rephrase, workers=4)
+    p.stage("send", send, ordered=True)
+    stats = p.run(iter_sections(rows))
+    print_stats(stats)
+
+Per stage the run reports items, errors, busy time, throughput and the depth
+of its input queue (sampled on every get).
+"""
+
+import heapq
+import queue
+import threading
+import time
+from typing import Callable, Iterable, List, Optional
+
+_DONE = object()
+_SKIP = object()  # placeholder for an item dropped upstream, keeps sequence numbers contiguous
+
+
+class StageStats:
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.errors = 0
+        self.busy = 0.0          # summed over workers
+        self.first = None
+        self.last = None
+        self.depth_max = 0
+        self.depth_sum = 0
+        self.depth_samples = 0
+        self.lock = threading.Lock()
+
+    def sample_depth(self, q: queue.Queue):
+        d = q.qsize()
+        self.depth_samples += 1
+        self.depth_sum += d
+        self.depth_max = max(self.depth_max, d)
+
+    def record(self, started: float, ok: bool):
+        now = time.perf_counter()
+        with self.lock:
+            self.items += 1
+            self.errors += not ok
+            self.busy += now - started
+            self.first = started if self.first is None else min(self.first, started)
+            self.last = now
+
+    def as_dict(self) -> dict:
+        wall = (self.last - self.first) if self.first is not None else 0.0
+        return {
+            "stage": self.name, "workers": self.workers, "items": self.items, "errors": self.errors,
+            "busy_s": round(self.busy, 3), "wall_s": round(wall, 3),
+            "items_per_s": round(self.items / wall, 2) if wall else 0.0,
+            "queue_max": self.depth_max,
+            "queue_avg": round(self.depth_sum / self.depth_samples, 2) if self.depth_samples else 0.0,
+        }
+
+
+class _Stage:
+    def __init__(self, name, fn, workers, ordered, on_close):
+        if ordered and workers != 1:
+            raise ValueError("an ordered stage runs a single worker")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.ordered = ordered
+        self.on_close = on_close
+        self.stats = StageStats(name, workers)
+
+
+class Pipeline:
+    def __init__(self, maxsize: int = 8, on_error: Optional[Callable[[str, Exception], None]] = None):
+        self.maxsize = maxsize
+        self.on_error = on_error or (lambda stage, e: print(f"❌ {stage}: {e}"))
+        self.stages: List[_Stage] = []
+
+    def stage(self, name: str, fn: Callable, workers: int = 1, ordered: bool = False,
+              on_close: Optional[Callable[[], None]] = None) -> "Pipeline":
+        """
+        Add a stage. ``fn(item)`` returns the next item, or None to drop it.
+        ``on_close`` runs in each worker thread when it exits (e.g. to close a
+        thread-bound browser session opened by ``fn``).
+        """
+        self.stages.append(_Stage(name, fn, workers, ordered, on_close))
+        return self
+
+    # ---------- workers ----------
+    def _worker(self, st: _Stage, inq: queue.Queue, outq: Optional[queue.Queue], finished: list):
+        reorder, next_seq = [], 0
+        try:
+            while True:
+                st.stats.sample_depth(inq)
+                msg = inq.get()
+                if msg is _DONE:
+                    inq.put(_DONE)  # let sibling workers see it too
+                    break
+                if st.ordered:
+                    heapq.heappush(reorder, msg)
+                    ready = []
+                    while reorder and reorder[0][0] == next_seq:
+                        ready.append(heapq.heappop(reorder))
+                        next_seq += 1
+                else:
+                    ready = [msg]
+                for seq, item in ready:
+                    result = _SKIP
+                    if item is not _SKIP:
+                        t0 = time.perf_counter()
+                        try:
+                            out = st.fn(item)
+                            result = _SKIP if out is None else out
+                            st.stats.record(t0, True)
+                        except Exception as e:
+                            st.stats.record(t0, False)
+                            self.on_error(st.name, e)
+                    if outq is not None:
+                        outq.put((seq, result))
+        finally:
+            if st.on_close:
+                try:
+                    st.on_close()
+                except Exception as e:
+                    self.on_error(st.name, e)
+            with st.stats.lock:
+                finished[0] += 1
+                last = finished[0] == st.workers
+            if last and outq is not None:
+                outq.put(_DONE)
+
+    def run(self, source: Iterable) -> List[dict]:
+        """Feed ``source`` through every stage; returns per-stage stats (source first)."""
+        queues = [queue.Queue(self.maxsize) for _ in self.stages]
+        threads = []
+        for i, st in enumerate(self.stages):
+            outq = queues[i + 1] if i + 1 < len(queues) else None
+            finished = [0]
+            for w in range(st.workers):
+                t = threading.Thread(target=self._worker, args=(st, queues[i], outq, finished),
+                                     name=f"{st.name}-{w}", daemon=True)
+                t.start()
+                threads.append(t)
+
+        src = StageStats("source", 1)
+        it = iter(source)
+        seq = 0
+        try:
+            while True:
+                t0 = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                src.record(t0, True)
+                queues[0].put((seq, item))  # blocks while the first stage is behind
+                seq += 1
+        finally:
+            queues[0].put(_DONE)
+            for t in threads:
+                t.join()
+        return [src.as_dict()] + [st.stats.as_dict() for st in self.stages]
+
+
+def print_stats(stats: List[dict]):
+    print(f"{'stage':<10} {'wkr':>3} {'items':>6} {'err':>4} {'busy s':>8} {'wall s':>8} "
+          f"{'items/s':>8} {'q max':>6} {'q avg':>6}")
+    for s in stats:
+        print(f"{s['stage']:<10} {s['workers']:>3} {s['items']:>6} {s['errors']:>4} {s['busy_s']:>8.2f} "
+              f"{s['wall_s']:>8.2f} {s['items_per_s']:>8.2f} {s['queue_max']:>6} {s['queue_avg']:>6.2f}")
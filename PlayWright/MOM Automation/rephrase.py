@@ -0,0 +1,214 @@
+"""
+rephrase.py
+
+Map-reduce rephrasing for long MoMs.
+
+The Markdown is split into sections (at headings, and at paragraph breaks for
+sections that would not fit one prompt), every section is rephrased
+concurrently under a cap, and the results are joined back in order. Each
+section result is cached on disk under a hash of (model, prompt, section), so
+sections that did not change cost no API call on the next run.
+
+    polished = rephrase_markdown(md_text, model="gpt-4o-mini", concurrency=4)
+
+Any OpenAI-compatible server works; set OPENAI_BASE_URL to use a local stub
+(fixture_server.py serves one at /v1).
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+SYSTEM_PROMPT = ("You are a helpful assistant. Rephrase the following meeting notes into a concise, "
+                 "professional Minutes of Meeting format. Keep any markdown-style bold/italic markers intact.")
+SECTION_PROMPT = ("Raw notes (one section of a longer MoM):\n{text}\n\n"
+                  "Rewrite this section concisely as Key Points and Action Items (bulleted). "
+                  "Preserve markdown formatting and any heading. Reply with the section only.")
+MAX_SECTION_CHARS = 6000
+RETRIES = 3
+
+_HEADING_RE = re.compile(r"^(?=#{1,6}[ \t])", re.M)
+
+
+# ---------- split / merge ----------
+def split_sections(md_text: str, max_chars: int = MAX_SECTION_CHARS) -> List[str]:
+    """Split at headings; a section longer than ``max_chars`` is packed by paragraphs."""
+    sections = []
+    for part in _HEADING_RE.split(md_text):
+        part = part.strip()
+        if not part:
+            continue
+        if len(part) <= max_chars:
+            sections.append(part)
+            continue
+        buf = ""
+        for para in part.split("\n\n"):
+            if buf and len(buf) + 2 + len(para) > max_chars:
+                sections.append(buf)
+                buf = ""
+            buf = f"{buf}\n\n{para}" if buf else para
+        if buf:
+            sections.append(buf)
+    return sections
+
+
+def iter_sections(blocks: Iterable[str], max_chars: int = MAX_SECTION_CHARS) -> Iterator[str]:
+    """
+    Streaming ``split_sections`` over Markdown blocks (e.g. sheet rows): a block
+    starting with a heading, or one that would overflow ``max_chars``, starts a
+    new section.
+    """
+    buf = ""
+    for block in blocks:
+        block = block.strip()
+        if not block:
+            continue
+        if buf and (_HEADING_RE.match(block) or len(buf) + 2 + len(block) > max_chars):
+            yield buf
+            buf = ""
+        buf = f"{buf}\n\n{block}" if buf else block
+    if buf:
+        yield buf
+
+
+def merge_sections(sections: List[str]) -> str:
+    return "\n\n".join(s.strip() for s in sections if s.strip())
+
+
+# ---------- cache ----------
+def cache_key(model: str, section: str) -> str:
+    h = hashlib.sha256()
+    for part in (model, SYSTEM_PROMPT, SECTION_PROMPT, section):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class RephraseCache:
+    """hash -> rephrased section, kept in a JSON file."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def get(self, key: str) -> Optional[str]:
+        return self.entries.get(key)
+
+    def put(self, key: str, value: str):
+        self.entries[key] = value
+        self.dirty = True
+
+    def save(self):
+        if not (self.path and self.dirty):
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+# ---------- map ----------
+def _messages(section: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": SECTION_PROMPT.format(text=section)},
+    ]
+
+
+def rephrase_section(client, model: str, section: str, cache: Optional[RephraseCache] = None) -> str:
+    """Blocking, cached rephrase of one section (for thread workers; see pipeline.py)."""
+    key = cache_key(model, section)
+    hit = cache.get(key) if cache else None
+    if hit is not None:
+        return hit
+    for attempt in range(RETRIES):
+        try:
+            resp = client.chat.completions.create(
+                model=model, messages=_messages(section), temperature=0.2, max_tokens=1200)
+            break
+        except Exception:
+            if attempt == RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt)
+    text = resp.choices[0].message.content.strip()
+    if cache:
+        cache.put(key, text)
+    return text
+
+
+async def _rephrase_one(client, model: str, section: str, sem) -> str:
+    import asyncio
+
+    messages = _messages(section)
+    async with sem:
+        for attempt in range(RETRIES):
+            try:
+                resp = await client.chat.completions.create(
+                    model=model, messages=messages, temperature=0.2, max_tokens=1200)
+                return resp.choices[0].message.content.strip()
+            except Exception:
+                if attempt == RETRIES - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+
+async def rephrase_sections(sections: List[str], client, model: str, concurrency: int = 4,
+                            cache: Optional[RephraseCache] = None) -> Tuple[List[str], dict]:
+    """Rephrase ``sections`` concurrently; returns (results in input order, stats)."""
+    import asyncio  # only the concurrent path needs it; keeps MOM_Automation startup light
+
+    cache = cache or RephraseCache()
+    t0 = time.perf_counter()
+    sem = asyncio.Semaphore(concurrency)
+    out: List[Optional[str]] = [None] * len(sections)
+    todo = {}  # key -> indexes; identical sections are sent once
+    for i, section in enumerate(sections):
+        key = cache_key(model, section)
+        hit = cache.get(key)
+        if hit is not None:
+            out[i] = hit
+        else:
+            todo.setdefault(key, []).append(i)
+
+    async def run(key, idxs):
+        text = await _rephrase_one(client, model, sections[idxs[0]], sem)
+        cache.put(key, text)
+        for i in idxs:
+            out[i] = text
+
+    await asyncio.gather(*(run(k, v) for k, v in todo.items()))
+    stats = {"sections": len(sections), "cached": len(sections) - sum(map(len, todo.values())),
+             "api_calls": len(todo), "seconds": round(time.perf_counter() - t0, 2)}
+    return out, stats
+
+
+def rephrase_markdown(md_text: str, model: str, concurrency: int = 4, cache_path: Optional[str] = None,
+                      max_chars: int = MAX_SECTION_CHARS, client=None) -> str:
+    """Split, rephrase concurrently (cached), merge. Builds an AsyncOpenAI client if none is given."""
+    import asyncio
+
+    sections = split_sections(md_text, max_chars)
+    cache = RephraseCache(cache_path)
+
+    async def go():
+        if client is not None:
+            return await rephrase_sections(sections, client, model, concurrency, cache)
+        from openai import AsyncOpenAI
+        async with AsyncOpenAI() as c:
+            return await rephrase_sections(sections, c, model, concurrency, cache)
+
+    try:
+        results, stats = asyncio.run(go())
+    finally:
+        cache.save()  # keep whatever finished, even if one section failed
+    print(f"Rephrased {stats['sections']} section(s): {stats['api_calls']} API call(s), "
+          f"{stats['cached']} from cache, {stats['seconds']}s.")
+    return merge_sections(results)
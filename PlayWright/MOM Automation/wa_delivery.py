@@ -0,0 +1,280 @@
+"""
+wa_delivery.py
+
+WhatsApp Web delivery over one logged-in browser session.
+
+A WhatsAppSession launches the browser once, restores ``wa_state.json`` once
+and then posts to any number of groups from the same tab, reporting per-group
+success and timing:
+
+    with WhatsAppSession() as wa:
+        results = wa.fan_out(message, ["Team A", "Team B"])
+
+Groups are sent one after another in a single tab. WhatsApp Web allows one
+active tab per session; a second tab on the same login shows "WhatsApp is
+open in another window", so parallel tabs are not safe here. The saving
+comes from not paying a browser launch and session restore per group.
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import chat_format
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from waits import WaitMetrics, wait_for_text_cleared  # noqa: E402
+
+WHATSAPP_URL = os.environ.get("WHATSAPP_URL", "https://web.whatsapp.com")
+WA_STORAGE = "wa_state.json"
+
+
+# ---------- page helpers ----------
+def open_whatsapp(context, storage_state: str = WA_STORAGE, url: str = WHATSAPP_URL):
+    page = context.new_page()
+    page.goto(url)
+
+    if not os.path.exists(storage_state):
+        print("Scan QR code for WhatsApp Web (you have 2 minutes)...")
+        page.wait_for_selector("span[title]", timeout=120_000)
+        print("QR scanned. Saving login state...")
+        context.storage_state(path=storage_state)
+        print(f"Saved state to {storage_state}")
+    else:
+        page.wait_for_selector("span[title]", timeout=30_000)
+    return page
+
+CHAT_ROW = "div[role='row']"
+CHAT_ROW_TITLES = f"{CHAT_ROW} span[title]"
+SEARCH_BOX = "div[contenteditable='true'][data-tab='3']"
+
+def title_selector(title: str) -> str:
+    """Exact-title CSS selector; JSON string quoting is valid CSS string quoting."""
+    return f"{CHAT_ROW} span[title={json.dumps(title, ensure_ascii=False)}]"
+
+
+class GroupIndex:
+    """
+    Resolves a group name to a chat row with as few browser round-trips as possible.
+
+    ``refresh`` reads every rendered chat title in one ``evaluate`` call; names are
+    then matched in Python (exact, then case-insensitive substring, like the old
+    loop) and the resolved title -> selector pairs are cached for later sends.
+    Chats outside the virtualized list are found through the search box.
+    """
+
+    def __init__(self):
+        self.titles: List[str] = []
+        self.resolved: Dict[str, str] = {}  # requested name -> exact-title selector
+
+    def refresh(self, page) -> List[str]:
+        self.titles = page.evaluate(
+            "sel => Array.from(document.querySelectorAll(sel), e => e.getAttribute('title'))",
+            CHAT_ROW_TITLES,
+        )
+        return self.titles
+
+    def match(self, name: str) -> Optional[str]:
+        if name in self.titles:
+            return name
+        needle = name.lower()
+        return next((t for t in self.titles if needle in t.lower()), None)
+
+    def _search(self, page, name: str) -> Optional[str]:
+        box = page.locator(SEARCH_BOX).first
+        box.click()
+        page.keyboard.insert_text(name)
+        try:
+            page.wait_for_function(
+                "([sel, q]) => Array.from(document.querySelectorAll(sel))"
+                ".some(e => e.getAttribute('title').toLowerCase().includes(q))",
+                arg=[CHAT_ROW_TITLES, name.lower()], timeout=5_000,
+            )
+        except Exception:
+            return None
+        self.refresh(page)
+        return self.match(name)
+
+    def _clear_search(self, page):
+        box = page.locator(SEARCH_BOX).first
+        box.click()
+        page.keyboard.press("Control+A")
+        page.keyboard.press("Backspace")
+
+    def select(self, page, name: str):
+        selector = self.resolved.get(name)
+        if selector:
+            try:
+                page.locator(selector).first.click(timeout=2_000)
+                return
+            except Exception:
+                del self.resolved[name]  # scrolled out of the virtualized list, resolve again
+
+        title = self.match(name) if self.titles else None
+        if title is None:
+            self.refresh(page)
+            title = self.match(name)
+        searched = False
+        if title is None and page.locator(SEARCH_BOX).count():
+            title = self._search(page, name)
+            searched = True
+        if title is None:
+            if searched:
+                self._clear_search(page)
+            raise RuntimeError(f"Could not find WhatsApp group named '{name}'.")
+
+        selector = title_selector(title)
+        page.locator(selector).first.click(timeout=5_000)
+        if searched:
+            self._clear_search(page)
+        else:
+            self.resolved[name] = selector
+
+
+def select_group(page, group_name: str, index: Optional[GroupIndex] = None):
+    (index or GroupIndex()).select(page, group_name)
+
+def find_message_box(page):
+    input_selectors = [
+        "div[title='Type a message']",
+        "div[contenteditable='true'][data-tab='1']",
+        "div[contenteditable='true']"
+    ]
+    for sel in input_selectors:
+        if page.locator(sel).count() > 0:
+            return page.locator(sel).first
+    raise RuntimeError("Could not locate WhatsApp message input box.")
+
+def send_chunks(page, msg_box, chunks: List[str], metrics: WaitMetrics = None) -> WaitMetrics:
+    metrics = metrics or WaitMetrics()
+    for chunk in chunks:
+        msg_box.click()
+        page.keyboard.insert_text(chunk)
+        page.keyboard.press("Enter")
+        # WhatsApp clears the composer once the message is handed off.
+        wait_for_text_cleared(page, msg_box, metrics=metrics)
+    return metrics
+
+
+# ---------- session / fan-out ----------
+class GroupResult:
+    def __init__(self, group: str, ok: bool, chunks_sent: int, seconds: float, error: Optional[str] = None):
+        self.group = group
+        self.ok = ok
+        self.chunks_sent = chunks_sent
+        self.seconds = seconds
+        self.error = error
+
+    def as_dict(self) -> dict:
+        return {"group": self.group, "ok": self.ok, "chunks_sent": self.chunks_sent,
+                "seconds": round(self.seconds, 2), "error": self.error}
+
+    def __repr__(self):
+        return f"GroupResult({self.as_dict()})"
+
+
+class WhatsAppSession:
+    def __init__(self, storage_state: str = WA_STORAGE, headless: bool = False, url: str = WHATSAPP_URL):
+        self.storage_state = storage_state
+        self.headless = headless
+        self.url = url
+        self._pw = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.groups = GroupIndex()
+        self.setup_seconds = 0.0
+        self._current: Optional[str] = None
+
+    def __enter__(self) -> "WhatsAppSession":
+        from playwright.sync_api import sync_playwright  # imported here so non-sending runs skip it
+
+        t0 = time.perf_counter()
+        self._pw = sync_playwright().start()
+        try:
+            self.browser = self._pw.chromium.launch(headless=self.headless)
+            if os.path.exists(self.storage_state):
+                self.context = self.browser.new_context(storage_state=self.storage_state)
+                print("Loaded existing WhatsApp login state.")
+            else:
+                self.context = self.browser.new_context()
+            self.page = open_whatsapp(self.context, self.storage_state, self.url)
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
+        self.setup_seconds = time.perf_counter() - t0
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if self.browser is not None:
+                self.browser.close()
+        finally:
+            self._pw.stop()
+
+    def send(self, group: str, chunks: List[str]) -> GroupResult:
+        """Open ``group`` and post ``chunks``; never raises for a single group."""
+        t0 = time.perf_counter()
+        sent = 0
+        try:
+            self._current = None
+            self.groups.select(self.page, group)
+            self._current = group
+            msg_box = find_message_box(self.page)
+            for chunk in chunks:
+                send_chunks(self.page, msg_box, [chunk])
+                sent += 1
+            return GroupResult(group, True, sent, time.perf_counter() - t0)
+        except Exception as e:
+            return GroupResult(group, False, sent, time.perf_counter() - t0, str(e))
+
+    # ---------- single-chunk API used by the outbox worker (wa_queue.py) ----------
+    def _open(self, group: str):
+        if self._current != group:
+            self._current = None
+            self.groups.select(self.page, group)
+            self._current = group
+
+    def send_text(self, group: str, text: str):
+        """Post one chunk to ``group``; raises on failure so the caller can retry."""
+        try:
+            self._open(group)
+            send_chunks(self.page, find_message_box(self.page), [text])
+        except Exception:
+            self._current = None  # reselect next time, the chat may have moved
+            raise
+
+    def last_outgoing_text(self, group: str) -> Optional[str]:
+        """Text of the newest message we sent in ``group`` (None if there is none)."""
+        self._open(group)
+        return self.page.evaluate(
+            """() => {
+                const out = document.querySelectorAll('.message-out');
+                if (!out.length) return null;
+                const last = out[out.length - 1];
+                const body = last.querySelector('.selectable-text') || last;
+                return body.innerText;
+            }"""
+        )
+
+    def fan_out(self, message: str, groups: List[str], chunker: Optional[Callable[[str], List[str]]] = None,
+                on_result: Optional[Callable[[GroupResult], None]] = None) -> List[GroupResult]:
+        chunks = chunker(message) if chunker else list(chat_format.iter_chunks(message))
+        results = []
+        for group in groups:
+            result = self.send(group, chunks)
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return results
+
+
+def print_report(results: List[GroupResult], setup_seconds: float = 0.0):
+    ok = sum(r.ok for r in results)
+    print(f"Delivered to {ok}/{len(results)} groups (session setup {setup_seconds:.1f}s):")
+    for r in results:
+        status = "✅" if r.ok else "❌"
+        extra = f"  {r.error}" if r.error else ""
+        print(f"  {status} {r.group:<30} {r.chunks_sent} chunk(s) in {r.seconds:.2f}s{extra}")
@@ -0,0 +1,214 @@
+"""
+wa_queue.py
+
+Durable outbox (SQLite) for outbound WhatsApp chunks.
+
+Every chunk is stored with an idempotency key derived from
+(batch, group, position, text). The batch id names one run (e.g. sheet
+revision + run counter), so re-enqueueing after a crash in the same run is a
+no-op while the same text in a later run is sent again. A worker drains the
+outbox in per-group order with a send-rate limit and exponential backoff,
+recording sent / failed per chunk, so an interrupted run resumes exactly where
+it stopped. Chunks queued behind a permanently failed one are marked blocked
+(never sent out of order); ``retry_failed`` re-queues both.
+
+A chunk left in "sending" by a crash is ambiguous (it may or may not have been
+posted). On the next drain it is checked against the last outgoing message in
+that chat before it is re-sent.
+
+    outbox = Outbox("wa_outbox.sqlite3")
+    batch = outbox.enqueue(message, groups, chunker, batch=state.run_id(revision))
+    with WhatsAppSession() as wa:
+        outbox.drain(wa, rate_per_minute=20)
+    print(outbox.batch_status(batch))
+"""
+
+import hashlib
+import random
+import sqlite3
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+PENDING, SENDING, SENT, FAILED, BLOCKED = "pending", "sending", "sent", "failed", "blocked"
+_MARKUP = str.maketrans("", "", "*_~`")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    idem_key        TEXT    NOT NULL UNIQUE,
+    batch           TEXT    NOT NULL,
+    group_name      TEXT    NOT NULL,
+    seq             INTEGER NOT NULL,
+    body            TEXT    NOT NULL,
+    status          TEXT    NOT NULL DEFAULT 'pending',
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL    NOT NULL DEFAULT 0,
+    last_error      TEXT,
+    created_at      REAL    NOT NULL,
+    sent_at         REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_ready ON outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS outbox_order ON outbox (batch, group_name, seq);
+"""
+
+# Chunks at the head of their (batch, group): every predecessor is sent.
+_HEAD = """
+status IN ('pending', 'sending')
+  AND NOT EXISTS (SELECT 1 FROM outbox p
+                  WHERE p.batch = o.batch AND p.group_name = o.group_name
+                    AND p.seq < o.seq AND p.status != 'sent')
+"""
+# Next chunk that may go out now.
+_NEXT_READY = f"""
+SELECT id, batch, group_name, seq, body, status, attempts FROM outbox o
+WHERE {_HEAD} AND next_attempt_at <= ?
+ORDER BY created_at, id
+LIMIT 1
+"""
+# When the next head chunk (e.g. one in backoff) becomes ready; NULL if nothing can be sent.
+_NEXT_WAKE = f"SELECT MIN(next_attempt_at) FROM outbox o WHERE {_HEAD}"
+# Pending chunks behind a permanently failed one in the same (batch, group).
+_BLOCK = """
+UPDATE outbox SET status = 'blocked'
+WHERE status = 'pending'
+  AND EXISTS (SELECT 1 FROM outbox f
+              WHERE f.batch = outbox.batch AND f.group_name = outbox.group_name
+                AND f.seq < outbox.seq AND f.status = 'failed')
+"""
+
+
+def _plain(text: Optional[str]) -> str:
+    """Text as WhatsApp renders it: formatting markers become styling, whitespace collapses."""
+    return " ".join((text or "").translate(_MARKUP).split())
+
+
+def idempotency_key(batch: str, group: str, seq: int, body: str) -> str:
+    return hashlib.sha256(f"{batch}\x00{group}\x00{seq}\x00{body}".encode("utf-8")).hexdigest()
+
+
+class Outbox:
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path, isolation_level=None)  # autocommit; explicit BEGIN where needed
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        # Time of the last send, shared by every drain() on this outbox so the rate
+        # limit also holds across calls (e.g. one drain per pipeline section).
+        self._last_send = 0.0
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self) -> "Outbox":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---------- producer ----------
+    def enqueue(self, message: str, groups: Iterable[str], chunker: Callable[[str], List[str]],
+                batch: str) -> str:
+        """
+        Queue ``message`` for every group under ``batch`` (one id per run, stable
+        across a retry of that run). Returns the batch id.
+        """
+        chunks = chunker(message)
+        now = time.time()
+        rows = [
+            (idempotency_key(batch, g, seq, body), batch, g, seq, body, now)
+            for g in groups for seq, body in enumerate(chunks)
+        ]
+        self.db.execute("BEGIN")
+        self.db.executemany(
+            "INSERT OR IGNORE INTO outbox (idem_key, batch, group_name, seq, body, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self.db.execute("COMMIT")
+        return batch
+
+    # ---------- consumer ----------
+    def _mark(self, row_id: int, status: str, **fields):
+        cols = ", ".join(f"{k} = ?" for k in ("status", *fields))
+        self.db.execute(f"UPDATE outbox SET {cols} WHERE id = ?", (status, *fields.values(), row_id))
+
+    def drain(self, session, rate_per_minute: float = 20, max_attempts: int = 5,
+              base_backoff: float = 2.0, max_backoff: float = 300.0,
+              idle_exit: bool = True) -> Dict[str, dict]:
+        """
+        Send ready chunks through ``session`` (a WhatsAppSession) until nothing is
+        left to send now. Returns per-group stats {group: {"sent", "failed", "seconds"}}.
+
+        ``session`` must provide ``send_text(group, text)`` and
+        ``last_outgoing_text(group)``.
+        """
+        interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+        stats: Dict[str, dict] = {}
+        self.db.execute(_BLOCK)  # left behind by a failure in an older run
+        while True:
+            row = self.db.execute(_NEXT_READY, (time.time(),)).fetchone()
+            if row is None:
+                waiting = self.db.execute(_NEXT_WAKE).fetchone()[0]
+                if waiting is None or idle_exit and waiting - time.time() > max_backoff:
+                    return stats
+                time.sleep(max(0.0, min(waiting - time.time(), max_backoff)))
+                continue
+
+            row_id, batch, group, seq, body, status, attempts = row
+            st = stats.setdefault(group, {"sent": 0, "failed": 0, "seconds": 0.0})
+            t0 = time.perf_counter()
+
+            if status == SENDING:
+                # Crashed mid-send last time: only re-send if it did not reach the chat.
+                try:
+                    if _plain(session.last_outgoing_text(group)) == _plain(body):
+                        self._mark(row_id, SENT, sent_at=time.time())
+                        st["sent"] += 1
+                        continue
+                except Exception:
+                    pass
+
+            wait = self._last_send + interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._mark(row_id, SENDING, attempts=attempts + 1)
+            try:
+                session.send_text(group, body)
+            except Exception as e:
+                attempts += 1
+                if attempts >= max_attempts:
+                    self._mark(row_id, FAILED, last_error=str(e))
+                    self.db.execute(_BLOCK)
+                    st["failed"] += 1
+                else:
+                    delay = min(max_backoff, base_backoff * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+                    self._mark(row_id, PENDING, last_error=str(e), next_attempt_at=time.time() + delay)
+            else:
+                self._mark(row_id, SENT, sent_at=time.time(), last_error=None)
+                st["sent"] += 1
+            finally:
+                self._last_send = time.monotonic()
+                st["seconds"] += time.perf_counter() - t0
+
+    # ---------- reporting ----------
+    def batch_status(self, batch: str) -> Dict[str, Dict[str, int]]:
+        """{group: {status: count}} for one batch."""
+        out: Dict[str, Dict[str, int]] = {}
+        for group, status, count in self.db.execute(
+                "SELECT group_name, status, COUNT(*) FROM outbox WHERE batch = ? GROUP BY group_name, status",
+                (batch,)):
+            out.setdefault(group, {})[status] = count
+        return out
+
+    def pending_count(self) -> int:
+        return self.db.execute(
+            "SELECT COUNT(*) FROM outbox WHERE status IN ('pending', 'sending')").fetchone()[0]
+
+    def retry_failed(self, batch: Optional[str] = None) -> int:
+        """Put failed (and the blocked chunks behind them) back in the queue, e.g. after fixing a group name."""
+        sql = ("UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = 0 "
+               "WHERE status IN ('failed', 'blocked')")
+        args = ()
+        if batch:
+            sql += " AND batch = ?"
+            args = (batch,)
+        return self.db.execute(sql, args).rowcount
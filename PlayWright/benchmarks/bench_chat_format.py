@@ -0,0 +1,125 @@
+"""
+Markdown -> WhatsApp conversion: single-pass tokenizer (chat_format.py) vs the
+previous three-pass regex version, on multi-megabyte MoM-like inputs.
+
+    cd PlayWright/benchmarks
+    pytest bench_chat_format.py
+"""
+
+import re
+
+import pytest
+
+import chat_format
+
+SAMPLE_BLOCK = (
+    "## Daily stand-up\n"
+    "- **Owner:** *Ravi* to follow up on `deploy.sh` ***before Friday***\n"
+    "- Risks: **API quota** and *vendor* delays; snake_case_names stay as-is\n"
+    "1. Ship **v2** of the *MoM bot*\n\n"
+)
+
+
+def markdown_to_whatsapp_regex(md_text: str) -> str:
+    text = md_text
+    text = re.sub(r"\*\*\*([^\*]+)\*\*\*", r'*_\1_*', text)
+    text = re.sub(r"\*\*([^\*]+)\*\*", r'*\1*', text)
+    text = re.sub(r"(?<!\*)\*([^\*]+)\*(?!\*)", r'_\1_', text)
+    return text
+
+
+@pytest.fixture(scope="module", params=[1, 4])
+def markdown(request):
+    mb = request.param
+    return SAMPLE_BLOCK * (mb * 1_000_000 // len(SAMPLE_BLOCK))
+
+
+@pytest.mark.benchmark(group="markdown-to-whatsapp")
+def test_regex_three_pass(benchmark, markdown):
+    benchmark.pedantic(markdown_to_whatsapp_regex, args=(markdown,), rounds=3)
+
+
+@pytest.mark.benchmark(group="markdown-to-whatsapp")
+def test_tokenizer_single_pass(benchmark, markdown):
+    benchmark.pedantic(chat_format.markdown_to_whatsapp, args=(markdown,), rounds=3)
+
+
+@pytest.mark.benchmark(group="markdown-to-whatsapp")
+@pytest.mark.parametrize("target", ["slack", "telegram"])
+def test_tokenizer_other_targets(benchmark, markdown, target):
+    benchmark.pedantic(chat_format.convert, args=(markdown, target), rounds=3)
+
+
+def test_nested_and_adjacent_markers():
+    assert chat_format.markdown_to_whatsapp("***bi*** **b** *i*") == "*_bi_* *b* _i_"
+    assert chat_format.markdown_to_whatsapp("**bold *and italic* inside**") == "*bold _and italic_ inside*"
+    assert chat_format.markdown_to_whatsapp("*a**b**c*") == "_a*b*c_"
+
+
+# ---------- chunking ----------
+def chunk_text_slicing(text: str, max_len: int = 4000):
+    """Previous chunker: re-slices the remainder on every chunk (quadratic)."""
+    chunks = []
+    while text:
+        if len(text) <= max_len:
+            chunks.append(text)
+            break
+        idx = text.rfind("\n\n", 0, max_len)
+        if idx == -1:
+            idx = text.rfind("\n", 0, max_len)
+        if idx == -1:
+            idx = text.rfind(" ", 0, max_len)
+        if idx == -1:
+            idx = max_len
+        chunks.append(text[:idx].strip())
+        text = text[idx:].strip()
+    return chunks
+
+
+@pytest.fixture(scope="module")
+def whatsapp_10mb():
+    block = chat_format.markdown_to_whatsapp(SAMPLE_BLOCK) + "Emoji check 😀👍 and a ~struck~ word.\n"
+    return block * (10_000_000 // len(block))
+
+
+@pytest.mark.benchmark(group="chunk-10mb")
+def test_chunk_slicing(benchmark, whatsapp_10mb):
+    benchmark.pedantic(chunk_text_slicing, args=(whatsapp_10mb,), rounds=1)
+
+
+@pytest.mark.benchmark(group="chunk-10mb")
+def test_chunk_offsets(benchmark, whatsapp_10mb):
+    chunks = benchmark.pedantic(lambda: list(chat_format.iter_chunks(whatsapp_10mb, 4000)), rounds=3)
+    assert max(chat_format.utf16_len(c) for c in chunks) <= 4000
+
+
+@pytest.mark.parametrize("text, max_len, expected", [
+    ("*" + "a" * 25 + "*", 10, ["*aaaaaaaa*", "*aaaaaaaa*", "*aaaaaaaa*", "*a*"]),
+    ("*_" + "a" * 30 + "_*", 10, ["*_aaaaaa_*"] * 5),
+    ("x *" + "a" * 25 + "* y", 10, ["x", "*aaaaaaaa*", "*aaaaaaaa*", "*aaaaaaaa*", "*a* y"]),
+])
+def test_span_longer_than_several_chunks(text, max_len, expected):
+    assert list(chat_format.iter_chunks(text, max_len)) == expected
+
+
+def test_long_spans_stay_balanced():
+    text = "intro " + "*_" + "word" * 40 + "_*" + " and ~" + "x" * 33 + "~ end"
+    chunks = list(chat_format.iter_chunks(text, 16))
+    assert max(chat_format.utf16_len(c) for c in chunks) <= 16
+    for c in chunks:
+        for marker in "*_~":
+            assert c.count(marker) % 2 == 0, chunks
+
+
+def test_max_len_too_small_for_fences_and_markers():
+    text = "a\n~b*```bbaword a*_😀😀 b```_b```word     _*"
+    with pytest.raises(ValueError):
+        list(chat_format.iter_chunks(text, 7))
+    chunks = list(chat_format.iter_chunks(text, 15))
+    assert max(chat_format.utf16_len(c) for c in chunks) <= 15
+
+
+def test_repeated_openers_do_not_pile_up():
+    text = " ".join(f"*w{i}" for i in range(200))
+    chunks = list(chat_format.iter_chunks(text, 12))
+    assert max(chat_format.utf16_len(c) for c in chunks) <= 12
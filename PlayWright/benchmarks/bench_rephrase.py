@@ -0,0 +1,41 @@
+"""
+Rephrase stage: one section at a time vs concurrent sections vs a re-run
+served from the section cache, against the fixture server's OpenAI stub.
+
+    cd PlayWright/benchmarks
+    pytest bench_rephrase.py
+"""
+
+import pytest
+
+pytest.importorskip("openai")
+
+from rephrase import rephrase_markdown, split_sections  # noqa: E402
+
+SECTIONS = 16
+MOM = "\n\n".join(
+    f"## Topic {i}\n- **Owner:** *Team {i}* to follow up\n- Risks: API quota, vendor delays"
+    for i in range(SECTIONS)
+)
+
+
+def test_split_sections():
+    assert len(split_sections(MOM)) == SECTIONS
+
+
+@pytest.mark.benchmark(group="rephrase")
+@pytest.mark.parametrize("concurrency", [1, 8])
+def test_rephrase_sections(benchmark, fixture_server, concurrency):
+    fixture_server.state.config["llm_latency_ms"] = 100
+    out = benchmark.pedantic(lambda: rephrase_markdown(MOM, "stub", concurrency), rounds=2)
+    assert out.count("## Topic") == SECTIONS
+
+
+@pytest.mark.benchmark(group="rephrase")
+def test_rephrase_cached_rerun(benchmark, fixture_server, tmp_path):
+    fixture_server.state.config["llm_latency_ms"] = 100
+    cache = str(tmp_path / "cache.json")
+    rephrase_markdown(MOM, "stub", 8, cache)  # warm
+    calls = fixture_server.state.llm_calls
+    benchmark.pedantic(lambda: rephrase_markdown(MOM, "stub", 8, cache), rounds=3)
+    assert fixture_server.state.llm_calls == calls
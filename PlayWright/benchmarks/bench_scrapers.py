@@ -0,0 +1,185 @@
+"""
+Phase-by-phase benchmarks for the Playwright scrapers against the local
+fixture server (no network needed):
+
+    cd PlayWright/benchmarks
+    pytest --benchmark-autosave            # record a baseline
+    pytest --benchmark-compare             # compare against the last run
+
+Each scraper is split into launch / navigation / extraction / send phases so a
+regression shows up in the phase that caused it.
+"""
+
+import asyncio
+import itertools
+
+import pytest
+
+import GenAI_Latest_News as news
+import playwright_keyfunctions as weather
+import MOM_Automation as mom
+from medium_crawler import crawl
+from route_filters import install_route_filter
+
+ROUNDS = 10
+
+
+# ---------- launch ----------
+@pytest.mark.benchmark(group="launch")
+def test_launch_browser(benchmark, playwright_instance):
+    def launch():
+        browser = playwright_instance.chromium.launch(headless=True)
+        browser.new_context().new_page()
+        browser.close()
+    benchmark.pedantic(launch, rounds=5)
+
+
+@pytest.mark.benchmark(group="launch")
+def test_new_context(benchmark, browser):
+    def new_context():
+        context = browser.new_context()
+        context.new_page()
+        context.close()
+    benchmark.pedantic(new_context, rounds=ROUNDS)
+
+
+# ---------- Medium news ----------
+@pytest.mark.benchmark(group="navigation")
+def test_medium_search_navigation(benchmark, page):
+    benchmark.pedantic(lambda: page.goto(news.search_url()), rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group="navigation")
+def test_medium_article_navigation(benchmark, page):
+    page.goto(news.search_url())
+    url = news.first_article_url(page)
+    benchmark.pedantic(lambda: page.goto(url), rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group="route-filter")
+@pytest.mark.parametrize("profile", ["off", "media", "lean"])
+def test_medium_article_route_profile(benchmark, page, profile):
+    page.goto(news.search_url())
+    url = news.first_article_url(page)
+    stats = install_route_filter(page, profile)
+    benchmark.pedantic(lambda: page.goto(url, wait_until="load"), rounds=ROUNDS)
+    benchmark.extra_info.update(stats.summary())
+
+
+@pytest.mark.benchmark(group="extraction")
+def test_medium_article_extraction(benchmark, page):
+    page.goto(news.search_url())
+    page.goto(news.first_article_url(page))
+    title, content = benchmark.pedantic(lambda: news.extract_article(page), rounds=ROUNDS)
+    assert title and content
+
+
+@pytest.mark.benchmark(group="crawl")
+@pytest.mark.parametrize("concurrency", [1, 4, 8])
+def test_medium_crawl(benchmark, tmp_path, concurrency):
+    runs = itertools.count()
+
+    def fresh_output():
+        return (str(tmp_path / f"crawl_{next(runs)}.jsonl"),), {}
+
+    stats = benchmark.pedantic(lambda out: asyncio.run(crawl("GenAI", 20, out, concurrency=concurrency)),
+                               setup=fresh_output, rounds=3)
+    assert stats["saved"] == 20
+    benchmark.extra_info["articles_per_minute"] = stats["articles_per_minute"]
+
+
+@pytest.mark.benchmark(group="crawl")
+def test_medium_incremental_recrawl(benchmark, tmp_path, fixture_server):
+    index = str(tmp_path / "index.json")
+    out = str(tmp_path / "crawl.jsonl")
+    asyncio.run(crawl("GenAI", 20, out, concurrency=4, index_path=index))
+    revisions = itertools.count(1)
+
+    def edit_one_article():
+        fixture_server.state.article_revisions["genai-story-003"] = next(revisions)
+
+    stats = benchmark.pedantic(lambda: asyncio.run(crawl("GenAI", 20, out, concurrency=4, index_path=index)),
+                               setup=edit_one_article, rounds=3)
+    assert stats["saved"] == 1 and stats["unchanged"] == 19
+
+
+# ---------- Google weather ----------
+@pytest.mark.benchmark(group="navigation")
+def test_weather_navigation(benchmark, page):
+    url = weather.weather_url("Tenkasi")
+    benchmark.pedantic(lambda: page.goto(url, wait_until="domcontentloaded"), rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group="extraction")
+def test_weather_extraction(benchmark, page):
+    # Includes waiting for the card to be filled in, which is what the scrapers pay.
+    url = weather.weather_url("Tenkasi")
+    data = benchmark.pedantic(lambda: weather.read_weather(page),
+                              setup=lambda: page.goto(url, wait_until="domcontentloaded"),
+                              rounds=ROUNDS)
+    assert data["temperature_c"]
+
+
+# ---------- WhatsApp send ----------
+@pytest.fixture
+def whatsapp_page(page, tmp_path):
+    # Any existing storage-state file skips the QR flow.
+    state = tmp_path / "wa_state.json"
+    state.write_text('{"cookies": [], "origins": []}', encoding="utf-8")
+    return mom.open_whatsapp(page.context, str(state))
+
+
+@pytest.mark.benchmark(group="send")
+def test_whatsapp_open(benchmark, page, tmp_path):
+    state = tmp_path / "wa_state.json"
+    state.write_text('{"cookies": [], "origins": []}', encoding="utf-8")
+    benchmark.pedantic(lambda: mom.open_whatsapp(page.context, str(state)).close(), rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group="send")
+def test_whatsapp_select_group(benchmark, whatsapp_page):
+    benchmark.pedantic(lambda: mom.select_group(whatsapp_page, mom.WHATSAPP_GROUP_NAME), rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group="group-lookup")
+@pytest.mark.parametrize("group", ["Team 030", "Team 250"], ids=["rendered-row", "outside-virtual-list"])
+def test_whatsapp_group_lookup(benchmark, whatsapp_page, group):
+    from wa_delivery import GroupIndex
+
+    index = GroupIndex()
+    benchmark.pedantic(lambda: index.select(whatsapp_page, group), rounds=ROUNDS)
+
+
+@pytest.mark.benchmark(group="send")
+def test_whatsapp_send_chunks(benchmark, whatsapp_page):
+    mom.select_group(whatsapp_page, mom.WHATSAPP_GROUP_NAME)
+    box = mom.find_message_box(whatsapp_page)
+    chunks = mom.chunk_text("*MoM* " + "action item. " * 800, mom.MAX_WA_CHUNK)
+    benchmark.pedantic(lambda: mom.send_chunks(whatsapp_page, box, chunks), rounds=ROUNDS)
+    sent = whatsapp_page.evaluate("window.__sent.length")
+    assert sent == len(chunks) * ROUNDS
+
+
+@pytest.mark.benchmark(group="fan-out")
+@pytest.mark.parametrize("mode", ["session-per-group", "one-session"])
+def test_whatsapp_fan_out(benchmark, tmp_path, fixture_server, mode):
+    from wa_delivery import WhatsAppSession
+
+    state = tmp_path / "wa_state.json"
+    state.write_text('{"cookies": [], "origins": []}', encoding="utf-8")
+    groups = fixture_server.state.chat_names[:20]
+    message = "*MoM* fan-out check"
+
+    def per_group():
+        results = []
+        for g in groups:
+            with WhatsAppSession(str(state), headless=True) as wa:
+                results += wa.fan_out(message, [g])
+        return results
+
+    def one_session():
+        with WhatsAppSession(str(state), headless=True) as wa:
+            return wa.fan_out(message, groups)
+
+    results = benchmark.pedantic(per_group if mode == "session-per-group" else one_session, rounds=2)
+    assert all(r.ok for r in results)
@@ -0,0 +1,44 @@
+"""
+Per-run Google Sheets client setup: ``build("sheets", "v4")`` every run (the
+old get_sheets_service) vs building from the on-disk discovery document over a
+keep-alive AuthorizedHttp vs the warm, cached service a daemon run reuses.
+No request is sent; only setup is timed.
+
+    cd PlayWright/benchmarks
+    pytest bench_sheets_setup.py
+"""
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+pytest.importorskip("google_auth_httplib2")
+
+from google.auth.credentials import AnonymousCredentials  # noqa: E402
+from googleapiclient.discovery import build  # noqa: E402
+
+import MOM_Automation as mom  # noqa: E402
+
+
+@pytest.fixture
+def discovery_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(mom, "DISCOVERY_CACHE_DIR", str(tmp_path))
+    mom._discovery_document("sheets", "v4")  # first run writes the cache
+
+
+@pytest.mark.benchmark(group="sheets-setup")
+def test_build_every_run(benchmark):
+    benchmark.pedantic(lambda: build("sheets", "v4", credentials=AnonymousCredentials()), rounds=10)
+
+
+@pytest.mark.benchmark(group="sheets-setup")
+def test_build_from_cached_document(benchmark, discovery_cache):
+    benchmark.pedantic(lambda: mom.build_service("sheets", "v4", AnonymousCredentials()), rounds=10)
+
+
+@pytest.mark.benchmark(group="sheets-setup")
+def test_warm_service_daemon(benchmark, discovery_cache, monkeypatch):
+    monkeypatch.setattr(mom, "_service_account_credentials", lambda sa_file: AnonymousCredentials())
+    mom.get_sheets_service.cache_clear()
+    mom.get_sheets_service("unused.json")
+    benchmark.pedantic(lambda: mom.get_sheets_service("unused.json"), rounds=10)
+    mom.get_sheets_service.cache_clear()
@@ -0,0 +1,66 @@
+"""
+Cold start of MOM_Automation: the lazy module (heavy deps imported on first
+use) vs what every run used to pay for googleapiclient, google.oauth2, openai
+and playwright at import time. Each round is a fresh interpreter, like cron.
+
+    cd PlayWright/benchmarks
+    pytest bench_startup.py -s
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+MOM_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "MOM Automation")
+HEAVY = ["googleapiclient.discovery", "google.oauth2.service_account", "openai", "playwright.sync_api"]
+
+
+def _python(*args) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=MOM_DIR, capture_output=True, text=True, check=True)
+
+
+def import_times(code: str) -> dict:
+    """{module: cumulative microseconds} from ``-X importtime``."""
+    times = {}
+    for line in _python("-X", "importtime", "-c", code).stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # header line
+    return times
+
+
+def test_lazy_import_skips_heavy_deps():
+    times = import_times("import MOM_Automation")
+    loaded = [m for m in HEAVY if m in times]
+    print(f"\nimport MOM_Automation: {times['MOM_Automation'] / 1000:.1f} ms")
+    assert not loaded, f"imported at module load: {loaded}"
+
+
+def test_eager_deps_import_time():
+    present = [m for m in HEAVY if importlib.util.find_spec(m.split(".")[0])]
+    if not present:
+        pytest.skip("none of the heavy dependencies are installed")
+    times = import_times("import " + ", ".join(present))
+    for m in present:
+        print(f"\nimport {m}: {times.get(m, 0) / 1000:.1f} ms")
+
+
+@pytest.mark.benchmark(group="cold-start")
+def test_cold_start_cli_help(benchmark):
+    benchmark.pedantic(lambda: _python("MOM_Automation.py", "--help"), rounds=5)
+
+
+@pytest.mark.benchmark(group="cold-start")
+def test_cold_start_eager_deps(benchmark):
+    present = [m for m in HEAVY if importlib.util.find_spec(m.split(".")[0])]
+    if not present:
+        pytest.skip("none of the heavy dependencies are installed")
+    code = "import " + ", ".join(present)
+    benchmark.pedantic(lambda: _python("-c", code), rounds=5)
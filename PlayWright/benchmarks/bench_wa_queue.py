@@ -0,0 +1,126 @@
+"""
+WhatsApp outbox (wa_queue.py): drain throughput against an in-memory session,
+plus ordering / failure / idempotency checks.
+
+    cd PlayWright/benchmarks
+    pytest bench_wa_queue.py
+"""
+
+import signal
+import time
+
+import pytest
+
+import wa_queue
+from wa_queue import Outbox
+
+
+class FakeSession:
+    """Records sends; ``fail`` maps a chunk body to how many sends of it raise (-1 = always)."""
+
+    def __init__(self, fail=None):
+        self.sent = []
+        self.fail = dict(fail or {})
+
+    def send_text(self, group, text):
+        left = self.fail.get(text, 0)
+        if left:
+            self.fail[text] = left - 1
+            raise RuntimeError(f"send of {text!r} failed")
+        self.sent.append((group, text))
+
+    def last_outgoing_text(self, group):
+        return next((t for g, t in reversed(self.sent) if g == group), None)
+
+
+def split_lines(message):
+    return message.split("\n")
+
+
+def drain_with_timeout(outbox, session, timeout=10, **kwargs):
+    # The SQLite connection is thread-bound, so guard with SIGALRM instead of a worker thread.
+    def hung(signum, frame):
+        raise TimeoutError("drain did not return")
+
+    old = signal.signal(signal.SIGALRM, hung)
+    signal.alarm(timeout)
+    try:
+        return outbox.drain(session, **kwargs)
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, old)
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    with Outbox(str(tmp_path / "outbox.sqlite3")) as ob:
+        yield ob
+
+
+def test_failed_chunk_blocks_the_rest_and_drain_returns(outbox):
+    batch = outbox.enqueue("one\nbad\nafter", ["g1", "g2"], split_lines, "run1")
+    session = FakeSession({"bad": -1})
+    stats = drain_with_timeout(outbox, session, rate_per_minute=0, max_attempts=2, base_backoff=0.01)
+
+    assert [t for g, t in session.sent if g == "g1"] == ["one"]
+    assert outbox.batch_status(batch)["g1"] == {"sent": 1, "failed": 1, "blocked": 1}
+    assert stats["g1"]["failed"] == 1
+    assert outbox.pending_count() == 0
+    # A later drain (e.g. main() on the next start) must not hang either.
+    drain_with_timeout(outbox, session, rate_per_minute=0)
+
+    assert outbox.retry_failed(batch) == 4
+    session.fail.clear()
+    drain_with_timeout(outbox, session, rate_per_minute=0)
+    assert [t for g, t in session.sent if g == "g2"] == ["one", "bad", "after"]
+
+
+def test_backoff_sleeps_instead_of_spinning(outbox, monkeypatch):
+    sleeps = []
+    real_sleep = wa_queue.time.sleep
+    monkeypatch.setattr(wa_queue.time, "sleep", lambda s: sleeps.append(s) or real_sleep(s))
+    outbox.enqueue("flaky\nafter", ["g"], split_lines, "run1")
+    session = FakeSession({"flaky": 1})
+    drain_with_timeout(outbox, session, rate_per_minute=0, base_backoff=0.2)
+
+    assert [t for _, t in session.sent] == ["flaky", "after"]
+    assert len(sleeps) <= 3 and sum(sleeps) >= 0.15
+
+
+def test_same_text_is_resent_in_a_new_run_only(outbox):
+    session = FakeSession()
+    outbox.enqueue("same text", ["g"], split_lines, "run1@rev")
+    drain_with_timeout(outbox, session, rate_per_minute=0)
+    outbox.enqueue("same text", ["g"], split_lines, "run1@rev")  # retry of the same run
+    drain_with_timeout(outbox, session, rate_per_minute=0)
+    assert len(session.sent) == 1
+    outbox.enqueue("same text", ["g"], split_lines, "run2@rev")
+    drain_with_timeout(outbox, session, rate_per_minute=0)
+    assert len(session.sent) == 2
+
+
+def test_rate_limit_holds_across_drains(outbox, monkeypatch):
+    sent_at = []
+    session = FakeSession()
+    monkeypatch.setattr(session, "send_text", lambda group, text: sent_at.append(time.monotonic()))
+    for section in range(3):  # the pipeline drains once per section
+        outbox.enqueue(f"section {section}", ["g"], split_lines, f"run1/{section}")
+        drain_with_timeout(outbox, session, rate_per_minute=600)
+    gaps = [b - a for a, b in zip(sent_at, sent_at[1:])]
+    assert len(sent_at) == 3 and min(gaps) >= 0.09
+
+
+@pytest.mark.benchmark(group="outbox-drain")
+def test_drain_1000_chunks(benchmark, tmp_path):
+    counter = iter(range(1_000_000))
+
+    def setup():
+        ob = Outbox(str(tmp_path / f"bench{next(counter)}.sqlite3"))
+        ob.enqueue("\n".join(f"chunk {i}" for i in range(250)), ["a", "b", "c", "d"], split_lines, "run1")
+        return (ob,), {}
+
+    def run(ob):
+        ob.drain(FakeSession(), rate_per_minute=0)
+        ob.close()
+
+    benchmark.pedantic(run, setup=setup, rounds=3)
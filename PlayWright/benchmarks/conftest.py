@@ -0,0 +1,54 @@
+"""
+Shared fixtures for the scraper benchmarks.
+
+The fixture server is started before any scraper module is imported, because
+the scrapers read their base URLs from the environment at import time.
+"""
+
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PLAYWRIGHT_DIR = os.path.dirname(HERE)
+sys.path.insert(0, PLAYWRIGHT_DIR)
+sys.path.insert(0, os.path.join(PLAYWRIGHT_DIR, "MOM Automation"))
+
+from fixture_server import FixtureServer  # noqa: E402
+
+SERVER = FixtureServer().start()
+os.environ.update(SERVER.env)
+# OpenAI clients need a key; every request goes to the fixture server stub.
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+
+def pytest_unconfigure(config):
+    SERVER.stop()
+
+
+@pytest.fixture(scope="session")
+def fixture_server():
+    return SERVER
+
+
+@pytest.fixture(scope="session")
+def playwright_instance():
+    from playwright.sync_api import sync_playwright
+    with sync_playwright() as p:
+        yield p
+
+
+@pytest.fixture(scope="session")
+def browser(playwright_instance):
+    browser = playwright_instance.chromium.launch(headless=True)
+    yield browser
+    browser.close()
+
+
+@pytest.fixture
+def page(browser):
+    context = browser.new_context()
+    page = context.new_page()
+    yield page
+    context.close()
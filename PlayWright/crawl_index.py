@@ -0,0 +1,117 @@
+"""
+crawl_index.py
+
+Persistent URL -> (ETag, Last-Modified, content hash) index for incremental
+re-crawls of the news scraper.
+
+Before an article is rendered in the browser, a plain HTTP GET is sent through
+Playwright's request context with If-None-Match / If-Modified-Since:
+
+- 304                          -> unchanged, skip
+- 2xx with the same page hash  -> unchanged, skip (server has no validators)
+- anything else                -> new / changed, render and extract
+
+Only 2xx / 304 responses update the index: a 403 / 429 / 404 (bot wall,
+rate limit, error page) looks the same on every run and must not be stored
+as the article's hash or validators.
+
+The hash ignores <script>/<style> blocks and tag attributes, which change on
+every request on most sites (nonces, build ids) without the article changing.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Optional, Tuple
+
+NEW, CHANGED, UNCHANGED = "new", "changed", "unchanged"
+
+_NOISE_RE = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.S | re.I)
+_ATTRS_RE = re.compile(r"<([a-zA-Z][a-zA-Z0-9-]*)\s[^>]*>")
+_WS_RE = re.compile(r"\s+")
+
+
+def content_hash(html: str) -> str:
+    text = _NOISE_RE.sub("", html)
+    text = _ATTRS_RE.sub(r"<\1>", text)
+    text = _WS_RE.sub(" ", text)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CrawlIndex:
+    def __init__(self, path: str, save_every: int = 25):
+        self.path = path
+        self.save_every = save_every
+        self._dirty = 0
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def conditional_headers(self, url: str) -> dict:
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def classify(self, url: str, status: int, headers: dict, body: Optional[str]) -> Tuple[str, Optional[str]]:
+        """Return (NEW|CHANGED|UNCHANGED, page hash; None for a 304 or a non-2xx response)."""
+        entry = self.entries.get(url)
+        if status == 304 and entry is not None:
+            return UNCHANGED, entry.get("hash")
+        if not 200 <= status < 300:
+            return (NEW if entry is None else CHANGED), None
+        if entry is None:
+            return NEW, content_hash(body) if body is not None else None
+        page_hash = content_hash(body) if body is not None else None
+        if page_hash and page_hash == entry.get("hash"):
+            return UNCHANGED, page_hash
+        return CHANGED, page_hash
+
+    def update(self, url: str, headers: dict, page_hash: Optional[str]):
+        entry = self.entries.setdefault(url, {})
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        if headers.get("etag"):
+            entry["etag"] = headers["etag"]
+        if headers.get("last-modified"):
+            entry["last_modified"] = headers["last-modified"]
+        if page_hash:
+            entry["hash"] = page_hash
+        entry["checked_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self._dirty += 1
+        if self._dirty >= self.save_every:
+            self.save()
+
+    def save(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp, self.path)
+        self._dirty = 0
+
+
+# ---------- probes through Playwright's APIRequestContext ----------
+def _index_headers(status: int, headers: dict) -> dict:
+    # Validators (ETag / Last-Modified) of an error page must not be sent back next time.
+    return headers if status == 304 or 200 <= status < 300 else {}
+
+
+def probe(request_context, index: CrawlIndex, url: str) -> Tuple[str, dict, Optional[str]]:
+    """Sync: conditional GET for ``url``; returns (state, headers to store, page hash)."""
+    resp = request_context.get(url, headers=index.conditional_headers(url), max_redirects=5)
+    body = resp.text() if resp.status != 304 else None
+    state, page_hash = index.classify(url, resp.status, resp.headers, body)
+    return state, _index_headers(resp.status, resp.headers), page_hash
+
+
+async def probe_async(request_context, index: CrawlIndex, url: str) -> Tuple[str, dict, Optional[str]]:
+    """Async flavour of ``probe`` for playwright.async_api."""
+    resp = await request_context.get(url, headers=index.conditional_headers(url), max_redirects=5)
+    body = await resp.text() if resp.status != 304 else None
+    state, page_hash = index.classify(url, resp.status, resp.headers, body)
+    return state, _index_headers(resp.status, resp.headers), page_hash
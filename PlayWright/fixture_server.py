@@ -0,0 +1,253 @@
+"""
+fixture_server.py
+
+Local HTTP server that stands in for Medium, Google and WhatsApp Web so the
+scrapers can be run and benchmarked with no network access.
+
+    python fixture_server.py --port 8765
+
+Routes:
+    /medium/search?q=GenAI      search results (article div[role='link'][data-href])
+    /medium/p/<slug>            article (h1 + article p), with ETag / Last-Modified
+    /google/search?q=...        weather card (#wob_tm / #wob_dc, filled in after load)
+    /whatsapp/                  fake WhatsApp Web (span[title] chat rows, contenteditable boxes)
+    /static/<name>?size=N       N bytes of filler with a content type matching <name>
+    POST /v1/chat/completions   OpenAI-compatible stub: echoes the last user message
+                                after ``llm_latency_ms``
+
+Page assets (images, fonts, css, a "third-party" tracker on a different host
+name) are included so route filtering has something to block.
+
+Point the scrapers at it with:
+    MEDIUM_BASE_URL=http://127.0.0.1:8765/medium
+    WEATHER_URL_TEMPLATE="http://127.0.0.1:8765/google/search?q={query}"
+    WHATSAPP_URL=http://127.0.0.1:8765/whatsapp/
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import mimetypes
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+DEFAULTS = {
+    "articles": 20,          # search results per query
+    "paragraphs": 30,        # paragraphs per article
+    "chats": 300,            # chats in the fake WhatsApp account
+    "visible_rows": 40,      # rows rendered by the virtualized chat list
+    "render_delay_ms": 150,  # weather card fill-in delay
+    "send_delay_ms": 50,     # WhatsApp composer clear delay after Enter
+    "startup_delay_ms": 300, # WhatsApp chat list appearance delay
+    "llm_latency_ms": 400,   # chat completion stub response time
+}
+
+_LOREM = ("Generative models keep changing how teams ship software. "
+          "Retrieval, evaluation and guardrails matter more than the model choice. "
+          "Latency budgets force trade-offs between context size and answer quality. ")
+
+
+def _template(name: str) -> Template:
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return Template(f.read())
+
+
+class FixtureState:
+    """Mutable knobs so benchmarks can e.g. edit an article between crawls."""
+
+    def __init__(self, **overrides):
+        self.config = dict(DEFAULTS, **overrides)
+        self.article_revisions = {}  # slug -> int, bump to change content
+        self.chat_names = [f"Team {i:03d}" for i in range(self.config["chats"] - 1)] + ["SE - AI-B2 - 1"]
+        self.requests = 0
+        self.llm_calls = 0
+
+    def article_slug(self, i: int) -> str:
+        return f"genai-story-{i:03d}"
+
+    def article(self, slug: str):
+        rev = self.article_revisions.get(slug, 0)
+        title = f"{slug.replace('-', ' ').title()} (rev {rev})"
+        paragraphs = [f"{slug} paragraph {p}. {_LOREM}" for p in range(self.config["paragraphs"])]
+        return title, paragraphs
+
+
+def make_handler(state: FixtureState):
+    templates = {n: _template(n) for n in ("medium_search.html", "medium_article.html",
+                                            "google_weather.html", "whatsapp.html")}
+
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _base(self) -> str:
+            return f"http://{self.headers.get('Host', '127.0.0.1')}"
+
+        def _tracker(self) -> str:
+            # Same server, different host name: the browser treats it as third-party.
+            port = self.server.server_address[1]
+            host = self.headers.get("Host", "127.0.0.1").split(":")[0]
+            return f"http://{'localhost' if host != 'localhost' else '127.0.0.1'}:{port}"
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_HEAD(self):
+            self.do_GET()
+
+        def do_GET(self):
+            state.requests += 1
+            url = urlparse(self.path)
+            qs = parse_qs(url.query)
+            path = url.path
+
+            if path == "/medium/search":
+                self._medium_search(qs.get("q", [""])[0])
+            elif path.startswith("/medium/p/"):
+                self._medium_article(path[len("/medium/p/"):])
+            elif path == "/google/search":
+                self._google_weather(qs.get("q", [""])[0])
+            elif path.rstrip("/") == "/whatsapp":
+                self._whatsapp()
+            elif path.startswith("/static/"):
+                size = int(qs.get("size", ["1024"])[0])
+                ctype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                self._send(200, b"\0" * size, ctype, {"Cache-Control": "no-store"})
+            else:
+                self._send(404, b"not found", "text/plain")
+
+        def do_POST(self):
+            state.requests += 1
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if urlparse(self.path).path.rstrip("/") == "/v1/chat/completions":
+                self._chat_completion(json.loads(body or b"{}"))
+            else:
+                self._send(404, b"not found", "text/plain")
+
+        def _chat_completion(self, req: dict):
+            state.llm_calls += 1
+            time.sleep(state.config["llm_latency_ms"] / 1000)
+            user = [m["content"] for m in req.get("messages", []) if m.get("role") == "user"]
+            text = user[-1] if user else ""
+            resp = {
+                "id": f"chatcmpl-{state.llm_calls}", "object": "chat.completion", "created": int(time.time()),
+                "model": req.get("model", "stub"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": {"prompt_tokens": len(text) // 4, "completion_tokens": len(text) // 4,
+                          "total_tokens": len(text) // 2},
+            }
+            self._send(200, json.dumps(resp).encode("utf-8"), "application/json")
+
+        def _medium_search(self, query: str):
+            base = self._base()
+            items = []
+            for i in range(state.config["articles"]):
+                slug = state.article_slug(i)
+                items.append(
+                    f'    <article><div role="link" data-href="{base}/medium/p/{slug}">'
+                    f'<h2>{html.escape(state.article(slug)[0])}</h2></div></article>'
+                )
+            body = templates["medium_search.html"].substitute(
+                query=html.escape(query), articles="\n".join(items), tracker=self._tracker())
+            self._send(200, body.encode("utf-8"), "text/html; charset=utf-8")
+
+        def _medium_article(self, slug: str):
+            title, paragraphs = state.article(slug)
+            body = templates["medium_article.html"].substitute(
+                title=html.escape(title), slug=slug, tracker=self._tracker(),
+                paragraphs="\n".join(f"    <p>{html.escape(p)}</p>" for p in paragraphs),
+            ).encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            rev = state.article_revisions.get(slug, 0)
+            headers = {"ETag": etag, "Last-Modified": formatdate(1_700_000_000 + rev * 3600, usegmt=True)}
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", "text/html; charset=utf-8", headers)
+                return
+            self._send(200, body, "text/html; charset=utf-8", headers)
+
+        def _google_weather(self, query: str):
+            body = templates["google_weather.html"].substitute(
+                query=html.escape(query), tracker=self._tracker(),
+                temp=20 + len(query) % 15, cond="Partly cloudy",
+                render_delay_ms=state.config["render_delay_ms"],
+            )
+            self._send(200, body.encode("utf-8"), "text/html; charset=utf-8")
+
+        def _whatsapp(self):
+            body = templates["whatsapp.html"].substitute(
+                chats=json.dumps(state.chat_names),
+                visible_rows=state.config["visible_rows"],
+                send_delay_ms=state.config["send_delay_ms"],
+                startup_delay_ms=state.config["startup_delay_ms"],
+            )
+            self._send(200, body.encode("utf-8"), "text/html; charset=utf-8")
+
+        def log_message(self, *args):
+            pass
+
+    return FixtureHandler
+
+
+class FixtureServer:
+    """Runs the fixture server on a background thread (port 0 = pick a free port)."""
+
+    def __init__(self, port: int = 0, **overrides):
+        self.state = FixtureState(**overrides)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), make_handler(self.state))
+        self.port = self.httpd.server_address[1]
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def env(self) -> dict:
+        """Environment variables that point every scraper at this server."""
+        return {
+            "MEDIUM_BASE_URL": f"{self.base_url}/medium",
+            "WEATHER_URL_TEMPLATE": f"{self.base_url}/google/search?q={{query}}",
+            "WHATSAPP_URL": f"{self.base_url}/whatsapp/",
+            "OPENAI_BASE_URL": f"{self.base_url}/v1",
+        }
+
+    def start(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+    server = FixtureServer(args.port)
+    print(f"Fixture server on {server.base_url}")
+    for k, v in server.env.items():
+        print(f"  export {k}='{v}'")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,162 @@
+"""
+medium_crawler.py
+
+Crawler mode for GenAI_Latest_News: collect the top N search results and fetch
+them through a bounded pool of pages in one browser.
+
+- URLs are de-duplicated (query string / fragment ignored)
+- every article is appended to a JSONL file as soon as it is extracted
+- re-running with the same output file skips URLs already in it (resume)
+- with an index file (crawl_index.py) URLs are re-checked instead, and only
+  new or changed articles are rendered and appended again
+- throughput is reported as articles/minute
+
+    python GenAI_Latest_News.py --crawl 50 --concurrency 6 --output genai_news.jsonl
+    python GenAI_Latest_News.py --crawl 50 --index genai_index.json      # daily incremental run
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Iterable, List, Optional, Set
+from urllib.parse import urlsplit, urlunsplit
+
+from playwright.async_api import async_playwright
+
+from GenAI_Latest_News import (ARTICLE_LINK_SELECTOR, PARAGRAPH_SELECTOR, ROUTE_PROFILE, TITLE_SELECTOR,
+                               search_url)
+from crawl_index import UNCHANGED, CrawlIndex, probe_async
+from route_filters import install_route_filter_async
+
+MAX_SCROLLS = 20
+ARTICLE_TIMEOUT_MS = 30_000
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path.rstrip("/"), "", ""))
+
+
+def dedupe(urls: Iterable[str]) -> List[str]:
+    seen: Set[str] = set()
+    out = []
+    for url in urls:
+        if not url:
+            continue
+        key = normalize_url(url)
+        if key not in seen:
+            seen.add(key)
+            out.append(url)
+    return out
+
+
+def load_done(output_path: str) -> Set[str]:
+    """Normalized URLs already present in the JSONL output (for resume)."""
+    done: Set[str] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                done.add(normalize_url(json.loads(line)["url"]))
+            except (ValueError, KeyError):
+                continue  # tolerate a half-written last line from an interrupted run
+    return done
+
+
+# ---------- async page helpers ----------
+async def collect_article_urls(page, query: str, limit: int) -> List[str]:
+    """Return up to ``limit`` unique result URLs, scrolling to load more results."""
+    await page.goto(search_url(query))
+    urls: List[str] = []
+    for _ in range(MAX_SCROLLS):
+        hrefs = await page.locator(ARTICLE_LINK_SELECTOR).evaluate_all(
+            "els => els.map(e => e.getAttribute('data-href'))")
+        before = len(urls)
+        urls = dedupe(hrefs)
+        if len(urls) >= limit or (len(urls) == before and before):
+            break
+        await page.mouse.wheel(0, 20_000)
+        await page.wait_for_timeout(500)  # infinite-scroll results have no reliable "done" signal
+    return urls[:limit]
+
+
+async def extract_article(page, url: str) -> dict:
+    await page.goto(url, timeout=ARTICLE_TIMEOUT_MS)
+    title = await page.locator(TITLE_SELECTOR).first.inner_text()
+    paragraphs = await page.locator(PARAGRAPH_SELECTOR).all_inner_texts()
+    return {"url": url, "title": title, "content": "\n\n".join(paragraphs)}
+
+
+# ---------- crawler ----------
+async def crawl(query: str, limit: int, output_path: str, concurrency: int = 4, headless: bool = True,
+                index_path: Optional[str] = None) -> dict:
+    # With an index, every URL is re-checked cheaply; without one, the output file is the resume log.
+    index = CrawlIndex(index_path) if index_path else None
+    done = set() if index else load_done(output_path)
+    started = time.perf_counter()
+    stats = {"found": 0, "skipped": 0, "unchanged": 0, "saved": 0, "failed": 0}
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        context = await browser.new_context()
+        routes = await install_route_filter_async(context, ROUTE_PROFILE)
+
+        search_page = await context.new_page()
+        urls = await collect_article_urls(search_page, query, limit)
+        await search_page.close()
+        stats["found"] = len(urls)
+        todo = [u for u in urls if normalize_url(u) not in done]
+        stats["skipped"] = len(urls) - len(todo)
+        print(f"Found {len(urls)} articles, {len(todo)} to fetch ({stats['skipped']} already in {output_path}).")
+
+        # Bounded pool: `concurrency` pages, reused across articles.
+        pages: asyncio.Queue = asyncio.Queue()
+        for _ in range(min(concurrency, len(todo)) or 1):
+            await pages.put(await context.new_page())
+        probes = asyncio.Semaphore(concurrency * 2)
+
+        with open(output_path, "a", encoding="utf-8") as out:
+            async def fetch(url):
+                if index:
+                    try:
+                        async with probes:
+                            state, headers, page_hash = await probe_async(context.request, index, url)
+                    except Exception:
+                        state, headers, page_hash = None, {}, None  # fall back to a full fetch
+                    if state == UNCHANGED:
+                        index.update(url, headers, page_hash)
+                        stats["unchanged"] += 1
+                        return
+                page = await pages.get()
+                try:
+                    article = await extract_article(page, url)
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"❌ {url}: {e}")
+                    return
+                finally:
+                    pages.put_nowait(page)
+                if index:
+                    index.update(url, headers, page_hash)
+                article["fetched_at"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+                out.write(json.dumps(article, ensure_ascii=False) + "\n")
+                out.flush()
+                stats["saved"] += 1
+                print(f"✅ [{stats['saved']}/{len(todo)}] {article['title'][:70]}")
+
+            await asyncio.gather(*(fetch(u) for u in todo))
+
+        if index:
+            index.save()
+        await browser.close()
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = round(elapsed, 2)
+    stats["articles_per_minute"] = round(stats["saved"] / elapsed * 60, 1) if elapsed else 0.0
+    stats["requests"] = routes.summary()
+    print(f"Saved {stats['saved']} articles in {stats['seconds']}s "
+          f"({stats['articles_per_minute']} articles/min), {stats['unchanged']} unchanged, "
+          f"{stats['failed']} failed.")
+    return stats
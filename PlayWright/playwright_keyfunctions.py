@@ -1,17 +1,27 @@
 from playwright.sync_api import sync_playwright
 
-def get_tenkasi_weather_google():
+from route_filters import install_route_filter
+from waits import WaitMetrics, wait_for_selectors
+from weather_page import WEATHER_ALLOW_SITES, WEATHER_ROUTE_PROFILE, WEATHER_SELECTORS, weather_url
+
+def read_weather(page):
+    metrics = wait_for_selectors(page, WEATHER_SELECTORS, metrics=WaitMetrics())
+    temp = page.locator("#wob_tm").inner_text()
+    cond = page.locator("#wob_dc").inner_text()
+    return {"temperature_c": temp, "condition": cond, "wait_ms": metrics.total_ms()}
+
+def get_tenkasi_weather_google(headless: bool = False):
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, args=["--disable-blink-features=AutomationControlled"])
+        browser = p.chromium.launch(headless=headless, args=["--disable-blink-features=AutomationControlled"])
         context = browser.new_context(user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114 Safari/537.36")
         page = context.new_page()
-        page.goto("https://www.google.com/search?q=Tenkasi+weather+update")
-        page.wait_for_timeout(4000)
-
-        temp = page.locator("#wob_tm").inner_text()
-        cond = page.locator("#wob_dc").inner_text()
+        routes = install_route_filter(page, WEATHER_ROUTE_PROFILE, allow_sites=WEATHER_ALLOW_SITES)
+        page.goto(weather_url("Tenkasi"), wait_until="domcontentloaded")
+        data = read_weather(page)
+        data["routes"] = routes.summary()
 
         browser.close()
-        return {"temperature_c": temp, "condition": cond}
+        return data
 
-print(get_tenkasi_weather_google())
+if __name__ == "__main__":
+    print(get_tenkasi_weather_google())
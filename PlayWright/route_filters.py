@@ -0,0 +1,169 @@
+"""
+route_filters.py
+
+Request interception profiles for the scrapers. They only read text, so
+images, media, fonts and third-party (analytics/ads) requests can be aborted
+through ``route`` before they ever hit the network.
+
+    stats = install_route_filter(page, "lean")
+    page.goto(url)
+    print(stats.summary())
+
+Install on a page or on a whole context; on a context each page keeps its own
+first party (the site of its last main-frame navigation), and iframe
+navigations are filtered like any other request. Transferred bytes are counted from
+``request.sizes()``, so running the same URL with "off" and another profile
+gives the bytes saved (see ``measure_savings`` / ``python route_filters.py URL``).
+"""
+
+import sys
+import weakref
+from collections import Counter
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+# resource types: document, stylesheet, image, media, font, script, texttrack,
+# xhr, fetch, eventsource, websocket, manifest, other
+ROUTE_PROFILES = {
+    "off": {"block_types": frozenset(), "block_third_party": False},
+    "media": {"block_types": frozenset({"image", "media", "font"}), "block_third_party": False},
+    "lean": {"block_types": frozenset({"image", "media", "font"}), "block_third_party": True},
+}
+
+
+def site_of(url: str) -> str:
+    """Rough registrable domain: last two labels of the host (IPs / localhost as-is)."""
+    host = (urlparse(url).hostname or "").lower()
+    if not host or host.replace(".", "").isdigit() or "." not in host:
+        return host
+    return ".".join(host.split(".")[-2:])
+
+
+class RouteStats:
+    def __init__(self, profile: str):
+        self.profile = profile
+        self.first_party = weakref.WeakKeyDictionary()  # page -> site of its main-frame document
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type = Counter()
+        self.bytes_loaded = 0
+
+    def summary(self) -> dict:
+        return {
+            "profile": self.profile,
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "bytes_loaded": self.bytes_loaded,
+        }
+
+
+def _page_of(request):
+    try:
+        return request.frame.page
+    except Exception:  # service worker requests have no frame
+        return None
+
+
+def _should_block(request, rules: dict, stats: RouteStats, allow_sites: frozenset) -> bool:
+    page = _page_of(request)
+    if request.is_navigation_request() and request.frame.parent_frame is None:
+        if page is not None:
+            stats.first_party[page] = site_of(request.url)
+        return False
+    if request.resource_type in rules["block_types"]:
+        return True
+    first_party: Optional[str] = stats.first_party.get(page) if page is not None else None
+    if rules["block_third_party"] and first_party:
+        site = site_of(request.url)
+        return site != first_party and site not in allow_sites
+    return False
+
+
+def _block_reason(request, rules) -> str:
+    return request.resource_type if request.resource_type in rules["block_types"] else "third-party"
+
+
+def install_route_filter(target, profile: str = "lean", allow_sites: Iterable[str] = ()) -> RouteStats:
+    """Install a route filter on a sync Page or BrowserContext."""
+    rules = ROUTE_PROFILES[profile]
+    stats = RouteStats(profile)
+    allow = frozenset(allow_sites)
+
+    def handle(route, request):
+        if _should_block(request, rules, stats, allow):
+            stats.blocked += 1
+            stats.blocked_by_type[_block_reason(request, rules)] += 1
+            route.abort()
+        else:
+            stats.allowed += 1
+            route.continue_()
+
+    def on_finished(request):
+        try:
+            stats.bytes_loaded += request.sizes()["responseBodySize"]
+        except Exception:
+            pass
+
+    target.route("**/*", handle)
+    target.on("requestfinished", on_finished)
+    return stats
+
+
+def install_route_filter_async(target, profile: str = "lean", allow_sites: Iterable[str] = ()):
+    """Same as install_route_filter for playwright.async_api (returns an awaitable)."""
+    rules = ROUTE_PROFILES[profile]
+    stats = RouteStats(profile)
+    allow = frozenset(allow_sites)
+
+    async def handle(route, request):
+        if _should_block(request, rules, stats, allow):
+            stats.blocked += 1
+            stats.blocked_by_type[_block_reason(request, rules)] += 1
+            await route.abort()
+        else:
+            stats.allowed += 1
+            await route.continue_()
+
+    async def on_finished(request):
+        try:
+            stats.bytes_loaded += (await request.sizes())["responseBodySize"]
+        except Exception:
+            pass
+
+    async def install():
+        await target.route("**/*", handle)
+        target.on("requestfinished", on_finished)
+        return stats
+
+    return install()
+
+
+def measure_savings(url: str, profile: str = "lean", allow_sites: Iterable[str] = ()) -> dict:
+    """Load ``url`` unfiltered and with ``profile``; report requests/bytes saved."""
+    from playwright.sync_api import sync_playwright
+
+    results = {}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        for name in ("off", profile):
+            context = browser.new_context()
+            page = context.new_page()
+            stats = install_route_filter(page, name, allow_sites)
+            page.goto(url, wait_until="load")
+            results[name] = stats.summary()
+            context.close()
+        browser.close()
+    base, filtered = results["off"], results[profile]
+    return {
+        "baseline": base,
+        "filtered": filtered,
+        "requests_saved": filtered["blocked"],
+        "bytes_saved": base["bytes_loaded"] - filtered["bytes_loaded"],
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python route_filters.py URL [profile]")
+    print(measure_savings(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else "lean"))
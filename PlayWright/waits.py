@@ -0,0 +1,115 @@
+"""
+waits.py
+
+Condition-based waits for the Playwright scrapers, instead of fixed sleeps.
+
+Every helper returns as soon as its condition holds and records how long it
+actually waited in a WaitMetrics object, so scripts can print or export the
+timings next to their results.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Resolves true once no mutation has been observed on `target` for `quietMs`,
+# or false if the page keeps mutating past `timeoutMs`.
+_DOM_STABLE_JS = """
+([selector, quietMs, timeoutMs]) => new Promise(resolve => {
+    const target = (selector && document.querySelector(selector)) || document.documentElement;
+    const obs = new MutationObserver(() => { clearTimeout(timer); timer = setTimeout(() => done(true), quietMs); });
+    let timer = setTimeout(() => done(true), quietMs);
+    const deadline = setTimeout(() => done(false), timeoutMs);
+    obs.observe(target, {subtree: true, childList: true, characterData: true, attributes: true});
+    function done(ok) { obs.disconnect(); clearTimeout(timer); clearTimeout(deadline); resolve(ok); }
+})
+"""
+
+
+class WaitMetrics:
+    """Collects (label, ms, ok) for every wait performed."""
+
+    def __init__(self):
+        self.records: List[dict] = []
+
+    @contextmanager
+    def measure(self, label: str):
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.records.append({"wait": label, "ms": round((time.perf_counter() - t0) * 1000, 1), "ok": ok})
+
+    def total_ms(self) -> float:
+        return round(sum(r["ms"] for r in self.records), 1)
+
+    def summary(self) -> dict:
+        return {"total_ms": self.total_ms(), "waits": list(self.records)}
+
+
+def wait_for_selectors(page, deadlines_ms: Dict[str, int], state: str = "visible",
+                       metrics: Optional[WaitMetrics] = None):
+    """
+    Wait for every selector in ``deadlines_ms`` (selector -> timeout in ms).
+
+    Deadlines are measured from the call, so a selector that appears early
+    leaves the remaining budget to the next one.
+    """
+    metrics = metrics or WaitMetrics()
+    start = time.perf_counter()
+    for selector, deadline in deadlines_ms.items():
+        remaining = max(1, deadline - int((time.perf_counter() - start) * 1000))
+        with metrics.measure(f"selector:{selector}"):
+            page.wait_for_selector(selector, state=state, timeout=remaining)
+    return metrics
+
+
+def wait_for_network_idle(page, timeout_ms: int = 10_000, metrics: Optional[WaitMetrics] = None):
+    metrics = metrics or WaitMetrics()
+    with metrics.measure("networkidle"):
+        page.wait_for_load_state("networkidle", timeout=timeout_ms)
+    return metrics
+
+
+def wait_for_dom_stable(page, selector: Optional[str] = None, quiet_ms: int = 300,
+                        timeout_ms: int = 10_000, metrics: Optional[WaitMetrics] = None):
+    """Wait until the DOM under ``selector`` stops mutating for ``quiet_ms``."""
+    metrics = metrics or WaitMetrics()
+    with metrics.measure(f"dom-stable:{selector or 'document'}"):
+        if not page.evaluate(_DOM_STABLE_JS, [selector, quiet_ms, timeout_ms]):
+            raise TimeoutError(f"DOM under {selector or 'document'} still mutating after {timeout_ms} ms")
+    return metrics
+
+
+def wait_for_text_cleared(page, locator, timeout_ms: int = 5_000, metrics: Optional[WaitMetrics] = None):
+    """Wait until an input / contenteditable element is empty again (e.g. after pressing Enter)."""
+    metrics = metrics or WaitMetrics()
+    handle = locator.element_handle(timeout=timeout_ms)
+    with metrics.measure("text-cleared"):
+        page.wait_for_function(
+            "el => (el.value !== undefined ? el.value : el.innerText).trim() === ''",
+            arg=handle, timeout=timeout_ms, polling="raf",
+        )
+    return metrics
+
+
+# ---------- async API variants ----------
+async def async_wait_for_selectors(page, deadlines_ms: Dict[str, int], state: str = "visible",
+                                   metrics: Optional[WaitMetrics] = None):
+    """Same as wait_for_selectors, for playwright.async_api pages."""
+    metrics = metrics or WaitMetrics()
+    start = time.perf_counter()
+    for selector, deadline in deadlines_ms.items():
+        remaining = max(1, deadline - int((time.perf_counter() - start) * 1000))
+        with metrics.measure(f"selector:{selector}"):
+            await page.wait_for_selector(selector, state=state, timeout=remaining)
+    return metrics
+
+
+async def async_wait_for_network_idle(page, timeout_ms: int = 10_000, metrics: Optional[WaitMetrics] = None):
+    metrics = metrics or WaitMetrics()
+    with metrics.measure("networkidle"):
+        await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+    return metrics
@@ -0,0 +1,21 @@
+"""
+weather_page.py
+
+The Google weather card: search URL, per-selector deadlines and route filter
+profile. Shared by playwright_keyfunctions.py and the Flask service
+(../Flask/weather_async.py, flask_weather.py), which import it from here.
+"""
+
+import os
+from urllib.parse import quote_plus
+
+# Per-selector deadlines (ms) for the Google weather card.
+WEATHER_SELECTORS = {"#wob_tm": 10_000, "#wob_dc": 2_000}
+WEATHER_URL_TEMPLATE = os.environ.get("WEATHER_URL_TEMPLATE", "https://www.google.com/search?q={query}")
+# Route filter profile (see route_filters.py); the weather card needs scripts from gstatic.
+WEATHER_ROUTE_PROFILE = os.environ.get("WEATHER_ROUTE_PROFILE", "lean")
+WEATHER_ALLOW_SITES = ("gstatic.com",)
+
+
+def weather_url(city: str) -> str:
+    return WEATHER_URL_TEMPLATE.format(query=quote_plus(f"{city} weather update"))